@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import customers,vendor,Account,Journal,JournalEntry,JournalItems,customer_contact,product,salesInvoice,InvoiceLine,vendor_product,purchaseinvoice,purchaseInvoiceLine,customer_payment,vendor_payment
+from .models import DocumentSequence,FiscalPeriod,AccountPeriodBalance,InvoiceImport,customers,vendor,Account,Journal,JournalEntry,JournalItems,customer_contact,product,salesInvoice,InvoiceLine,vendor_product,purchaseinvoice,purchaseInvoiceLine,customer_payment,vendor_payment
 # Register your models here.
 admin.site.register(Account)
 
@@ -31,5 +31,9 @@ admin.site.register(vendor_product)
 admin.site.register(purchaseinvoice)
 admin.site.register(purchaseInvoiceLine)
 admin.site.register(vendor_payment)
+admin.site.register(DocumentSequence)
+admin.site.register(FiscalPeriod)
+admin.site.register(AccountPeriodBalance)
+admin.site.register(InvoiceImport)
 
 
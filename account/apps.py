@@ -1,10 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class AccountConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account'
 
-
-
-
+    def ready(self):
+        from api.db_router import tune_sqlite
+        connection_created.connect(tune_sqlite, dispatch_uid='api.db_router.tune_sqlite')
@@ -0,0 +1,287 @@
+import csv
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import (DASHBOARD_CACHE_KEY, ImportStatus, InvoiceImport, InvoiceLine, InvoiceStatus, Journal,
+                     PaymentTerms, add_deltas, as_date, closed_through, customers, post_entries_bulk,
+                     posting_accounts, product, salesInvoice)
+
+# one row per invoice line; consecutive rows sharing "invoice" make up one invoice
+IMPORT_COLUMNS = ("invoice", "customer", "invoice_Date", "Due_Date", "payments_terms", "journal",
+                  "product", "quantity", "price", "description")
+IMPORT_BATCH_SIZE = 200
+IMPORT_MAX_ERRORS = 1000
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def import_executor():
+    """Process-local worker pool; imports never run on the request thread"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "INVOICE_IMPORT_WORKERS", 2),
+                thread_name_prefix="invoice-import",
+            )
+    return _executor
+
+
+def start_import(job):
+    # the worker must see the committed job row
+    transaction.on_commit(lambda: import_executor().submit(import_worker, job.pk))
+
+
+def import_worker(job_id):
+    # worker threads own their connections, so drop them around each job
+    close_old_connections()
+    try:
+        run_import(job_id)
+    finally:
+        close_old_connections()
+
+
+def read_rows(path):
+    """Yield each data row as a dict, streaming from CSV or XLSX"""
+    if path.lower().endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("xlsx import needs openpyxl installed") from None
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+            for values in rows:
+                if any(value not in (None, "") for value in values):
+                    yield dict(zip(header, values))
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as handle:
+            yield from csv.DictReader(handle)
+
+
+def count_rows(path):
+    if path.lower().endswith(".xlsx"):
+        return sum(1 for _ in read_rows(path))
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        return max(sum(1 for _ in csv.reader(handle)) - 1, 0)
+
+
+def grouped_invoices(rows):
+    """Group consecutive rows by their invoice key into (key, [(row_number, row), ...])"""
+    key, lines = None, []
+    for number, row in enumerate(rows, start=2):
+        row_key = str(row.get("invoice") or "").strip()
+        if lines and row_key != key:
+            yield key, lines
+            lines = []
+        key = row_key
+        lines.append((number, row))
+    if lines:
+        yield key, lines
+
+
+def text(value):
+    return str(value).strip() if value is not None else ""
+
+
+def to_id(value):
+    value = text(value)
+    if value.endswith(".0"):
+        value = value[:-2]
+    return int(value) if value.isdigit() else None
+
+
+def to_decimal(value):
+    try:
+        return Decimal(text(value))
+    except InvalidOperation:
+        return None
+
+
+def to_date(value):
+    if value in (None, ""):
+        return None
+    if hasattr(value, "year"):
+        return as_date(value)
+    try:
+        return parse_date(text(value))
+    except ValueError:
+        return None
+
+
+class InvoiceImporter:
+    """Validates grouped rows against lookup maps loaded once, then posts invoices in batches"""
+
+    def __init__(self, job):
+        self.job = job
+        self.customers = dict(customers.objects.values_list("id", "name"))
+        self.products = dict(product.objects.values_list("id", "price"))
+        self.journals = set(Journal.objects.values_list("id", flat=True))
+        self.payment_terms = set(PaymentTerms.values)
+        self.lock_date = closed_through()
+        self.receivable, self.sales = posting_accounts("sales_invoice")
+        self.errors = []
+
+    def error(self, number, key, message):
+        self.job.failed_rows += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": number, "invoice": key, "error": message})
+
+    def validate(self, key, lines):
+        """The invoice and line dicts for a group, or None after recording every bad row"""
+        first = lines[0][1]
+        problems = {}
+        customer_id = to_id(first.get("customer"))
+        journal_id = to_id(first.get("journal"))
+        invoice_date = to_date(first.get("invoice_Date")) or timezone.now().date()
+        due_date = to_date(first.get("Due_Date"))
+        terms = text(first.get("payments_terms"))
+
+        if not key:
+            problems[lines[0][0]] = "invoice is required"
+        elif not text(first.get("customer")):
+            problems[lines[0][0]] = "customer is required"
+        elif customer_id not in self.customers:
+            problems[lines[0][0]] = f"customer {first.get('customer')} not found"
+        elif journal_id not in self.journals:
+            problems[lines[0][0]] = f"journal {first.get('journal')} not found"
+        elif terms not in self.payment_terms:
+            problems[lines[0][0]] = f"payments_terms {terms} is not valid"
+        elif first.get("invoice_Date") not in (None, "") and to_date(first.get("invoice_Date")) is None:
+            problems[lines[0][0]] = "invoice_Date must be YYYY-MM-DD"
+        elif first.get("Due_Date") not in (None, "") and due_date is None:
+            problems[lines[0][0]] = "Due_Date must be YYYY-MM-DD"
+        elif self.lock_date and invoice_date <= self.lock_date:
+            problems[lines[0][0]] = f"invoice_Date {invoice_date} is in a closed period"
+
+        invoice_lines = []
+        for number, row in lines:
+            product_id = to_id(row.get("product"))
+            quantity = to_decimal(row.get("quantity"))
+            price = to_decimal(row.get("price")) if text(row.get("price")) else self.products.get(product_id)
+            if product_id not in self.products:
+                problems.setdefault(number, f"product {row.get('product')} not found")
+            elif quantity is None or quantity <= 0:
+                problems.setdefault(number, "quantity must be a positive number")
+            elif price is None:
+                problems.setdefault(number, "price must be a number")
+            invoice_lines.append({"Product_id": product_id, "quantity": quantity, "price": price,
+                                  "description": text(row.get("description")) or None})
+
+        if problems:
+            for number, _ in lines:
+                self.error(number, key, problems.get(number, "invoice has invalid rows"))
+            return None
+
+        return {
+            "customer_id": customer_id,
+            "journals_id": journal_id,
+            "invoice_Date": invoice_date,
+            "Due_Date": due_date,
+            "payments_terms": terms,
+            "lines": invoice_lines,
+            "rows": len(lines),
+        }
+
+    def post_batch(self, batch):
+        """Create, total and post a batch of validated invoices in one transaction"""
+        with transaction.atomic():
+            invoices = []
+            for data in batch:
+                total = sum((line["quantity"] * line["price"] for line in data["lines"]), Decimal("0.00"))
+                invoices.append(salesInvoice(
+                    customer_id=data["customer_id"], journals_id=data["journals_id"],
+                    invoice_Date=data["invoice_Date"], Due_Date=data["Due_Date"],
+                    payments_terms=data["payments_terms"], total=total.quantize(Decimal("0.01")),
+                    Status=InvoiceStatus.POSTED,
+                ))
+            salesInvoice.objects.bulk_create(invoices)
+
+            InvoiceLine.objects.bulk_create([
+                InvoiceLine(invoices=invoice, **line)
+                for invoice, data in zip(invoices, batch) for line in data["lines"]
+            ], batch_size=IMPORT_BATCH_SIZE)
+
+            entries = []
+            balances = {}
+            for invoice in invoices:
+                name = self.customers[invoice.customer_id]
+                entries.append({
+                    "journal_id": invoice.journals_id,
+                    "accounting_date": invoice.invoice_Date,
+                    "description": f"Invoice{invoice.id} - {name}-{invoice.customer_id}",
+                    "items": [
+                        {"account_id": self.receivable.id, "partner": name, "label": f"Invoice {invoice.id}",
+                         "debit": invoice.total, "credit": Decimal("0.00")},
+                        {"account_id": self.sales.id, "partner": name, "label": f"Invoice {invoice.id}",
+                         "debit": Decimal("0.00"), "credit": invoice.total},
+                    ],
+                })
+                balances[invoice.customer_id] = balances.get(invoice.customer_id, Decimal("0.00")) + invoice.total
+            post_entries_bulk(entries)
+            add_deltas(customers, "current_balance", balances)
+
+        self.job.created_invoices += len(invoices)
+
+    def flush(self, batch):
+        if batch:
+            try:
+                self.post_batch(batch)
+            except Exception as e:
+                for data in batch:
+                    self.job.failed_rows += data["rows"]
+                if len(self.errors) < IMPORT_MAX_ERRORS:
+                    self.errors.append({"row": None, "invoice": None, "error": f"batch of {len(batch)} invoices failed: {e}"})
+        InvoiceImport.objects.filter(pk=self.job.pk).update(
+            processed_rows=self.job.processed_rows, failed_rows=self.job.failed_rows,
+            created_invoices=self.job.created_invoices, errors=self.errors,
+        )
+
+    def run(self, rows):
+        batch = []
+        for key, lines in grouped_invoices(rows):
+            data = self.validate(key, lines)
+            self.job.processed_rows += len(lines)
+            if data:
+                batch.append(data)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+
+
+def run_import(job_id):
+    """Stream the stored upload into invoices, recording progress and row errors on the job"""
+    job = InvoiceImport.objects.get(pk=job_id)
+    importer = None
+    try:
+        job.total_rows = count_rows(job.path)
+        job.status = ImportStatus.RUNNING
+        job.save(update_fields=["total_rows", "status"])
+
+        importer = InvoiceImporter(job)
+        importer.run(read_rows(job.path))
+        job.status = ImportStatus.DONE
+    except Exception as e:
+        job.status = ImportStatus.FAILED
+        job.errors = (importer.errors if importer else []) + [{"row": None, "invoice": None, "error": str(e)}]
+        InvoiceImport.objects.filter(pk=job.pk).update(errors=job.errors)
+    finally:
+        job.finished_at = timezone.now()
+        InvoiceImport.objects.filter(pk=job.pk).update(status=job.status, finished_at=job.finished_at)
+        cache.delete(DASHBOARD_CACHE_KEY)
+        if os.path.exists(job.path):
+            os.remove(job.path)
+    return job
@@ -0,0 +1,176 @@
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.response import Response
+
+LIST_PAGE_SIZE = 50
+LIST_MAX_PAGE_SIZE = 500
+
+
+class ListError(ValueError):
+    pass
+
+
+def requested_fields(request, available):
+    fields = request.query_params.get('fields')
+    if not fields:
+        return list(available)
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ListError(f"unknown fields: {', '.join(unknown)}")
+    return names
+
+
+def load_plan(queryset, names):
+    """(only, prefetch) for the model fields behind names; only is None if a name isn't a model field"""
+    model = queryset.model
+    only, prefetch = [model._meta.pk.name], []
+    for name in names:
+        if name in queryset.query.annotations:
+            continue
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            only = None
+            continue
+        if field.one_to_many or field.many_to_many:
+            prefetch.append(name)
+        elif field.concrete and only is not None:
+            only.append(field.name)
+    # relations joined by select_related can't be deferred
+    if only is not None and isinstance(queryset.query.select_related, dict):
+        only += list(queryset.query.select_related)
+    return only, prefetch
+
+
+def ordering_for(request, orderable):
+    ordering = request.query_params.get('ordering') or orderable[0]
+    if ordering.lstrip('-') not in orderable:
+        raise ListError(f"ordering must be one of: {', '.join(orderable)}")
+    return ordering
+
+
+def is_nullable(model, field):
+    """Whether field can hold NULL; annotations and unknown names are treated as nullable"""
+    if field in ('pk', model._meta.pk.name):
+        return False
+    try:
+        return model._meta.get_field(field).null
+    except FieldDoesNotExist:
+        return True
+
+
+def order_queryset(queryset, ordering):
+    field = ordering.lstrip('-')
+    descending = ordering.startswith('-')
+    if not is_nullable(queryset.model, field):
+        # a plain ORDER BY keeps NOT NULL columns on their default btree index
+        return queryset.order_by(ordering, '-pk' if descending else 'pk')
+    if descending:
+        return queryset.order_by(F(field).desc(nulls_last=True), '-pk')
+    return queryset.order_by(F(field).asc(nulls_first=True), 'pk')
+
+
+def after_cursor(ordering, value, pk, nullable=True):
+    """Rows strictly after (value, pk) in the nulls-first ascending / nulls-last descending order"""
+    field = ordering.lstrip('-')
+    if field == 'pk' or field == 'id':
+        return Q(pk__lt=pk) if ordering.startswith('-') else Q(pk__gt=pk)
+    if ordering.startswith('-'):
+        if value is None:
+            return Q(**{f"{field}__isnull": True, "pk__lt": pk})
+        after = Q(**{f"{field}__lt": value}) | Q(**{field: value, "pk__lt": pk})
+        return after | Q(**{f"{field}__isnull": True}) if nullable else after
+    if value is None:
+        return Q(**{f"{field}__isnull": True, "pk__gt": pk}) | Q(**{f"{field}__isnull": False})
+    return Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk})
+
+
+def cursor_value(value):
+    if value is None or isinstance(value, (int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def list_page(request, queryset, salt, fields=None, serializer_class=None, orderable=('id',), filters=None, prefetch=None):
+    """One keyset page of queryset as {"results", "next_cursor", "has_more"}.
+
+    ?fields= narrows the columns loaded (only()) and returned, ?ordering= picks one of orderable
+    (indexed columns) with an optional "-", ?limit= caps the page and each filters key maps a
+    query parameter to a lookup. Rows come from serializer_class, or from fields, which maps
+    output names to model fields or annotations. prefetch maps a relation name to the Prefetch
+    used when that relation is requested.
+    """
+    model = queryset.model
+    try:
+        if serializer_class:
+            available = serializer_class().fields
+            names = requested_fields(request, available)
+            only, relations = load_plan(queryset, names)
+        else:
+            names = requested_fields(request, fields)
+            only, relations = load_plan(queryset, [fields[name] for name in names])
+        ordering = ordering_for(request, orderable)
+        limit = min(int(request.query_params.get('limit', LIST_PAGE_SIZE)), LIST_MAX_PAGE_SIZE)
+        if limit < 1:
+            raise ListError("limit must be at least 1")
+    except ListError as e:
+        return Response({"msg":str(e)},status=400)
+    except ValueError:
+        return Response({"msg":"limit must be a number"},status=400)
+
+    order_field = ordering.lstrip('-')
+    if only is not None:
+        queryset = queryset.only(*only, *([order_field] if order_field != 'id' else []))
+    if relations:
+        queryset = queryset.prefetch_related(*[(prefetch or {}).get(name, name) for name in relations])
+    queryset = order_queryset(queryset, ordering)
+
+    try:
+        for param, lookup in (filters or {}).items():
+            value = request.query_params.get(param)
+            if value not in (None, ''):
+                queryset = queryset.filter(**{lookup: value})
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                position = signing.loads(cursor, salt=salt)
+            except signing.BadSignature:
+                return Response({"msg":"invalid cursor"},status=400)
+            if position.get('ordering') != ordering:
+                return Response({"msg":"cursor does not match ordering"},status=400)
+            queryset = queryset.filter(after_cursor(ordering, position['value'], position['pk'],
+                                                          is_nullable(model, order_field)))
+
+        page = list(queryset[:limit + 1])
+    except (ValueError, ValidationError):
+        return Response({"msg":"invalid filter value"},status=400)
+
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    if serializer_class:
+        serializer = serializer_class(page, many=True)
+        for name in list(serializer.child.fields):
+            if name not in names:
+                serializer.child.fields.pop(name)
+        results = serializer.data
+    else:
+        attnames = {name: fields[name] if fields[name] in queryset.query.annotations
+                    else model._meta.get_field(fields[name]).attname for name in names}
+        results = [{name: getattr(row, attname) for name, attname in attnames.items()} for row in page]
+
+    next_cursor = None
+    if has_more:
+        last = page[-1]
+        next_cursor = signing.dumps({
+            "ordering":ordering,
+            "value":cursor_value(getattr(last, order_field)),
+            "pk":last.pk,
+        }, salt=salt)
+
+    return Response({"results":results, "next_cursor":next_cursor, "has_more":has_more}, status=200)
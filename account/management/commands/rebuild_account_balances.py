@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.reconcile import reconcile
+
+
+class Command(BaseCommand):
+    help = "Recompute Account.balance from journal items in bulk, or verify the stored values"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verify", action="store_true", help="only report accounts whose balance has drifted")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drifted = 0
+        for row in reconcile("accounts", chunk_size=options["batch_size"], fix=not options["verify"]):
+            self.stdout.write(f"{row['label']}: stored {row['stored']}, expected {row['expected']}")
+            drifted += 1
+
+        if options["verify"]:
+            if drifted:
+                raise CommandError(f"{drifted} account balance(s) out of sync")
+            self.stdout.write(self.style.SUCCESS("all account balances match their journal items"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"rebuilt {drifted} account balance(s)"))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from account.reconcile import RECONCILE_CHUNK_SIZE, RECONCILE_TARGETS, reconcile
+
+
+class Command(BaseCommand):
+    help = "Compare stored account, customer and vendor balances with the entries behind them, and optionally fix them"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", action="append", choices=list(RECONCILE_TARGETS),
+                            help="table to check, may be repeated (default: all)")
+        parser.add_argument("--fix", action="store_true", help="write the derived balance over drifted rows")
+        parser.add_argument("--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        drifted = 0
+        for target in options["target"] or RECONCILE_TARGETS:
+            for row in reconcile(target, chunk_size=options["chunk_size"], fix=options["fix"]):
+                self.stdout.write(f"{target} {row['id']} {row['label']}: stored {row['stored']}, expected {row['expected']}")
+                drifted += 1
+
+        if options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"fixed {drifted} balance(s)"))
+        elif drifted:
+            raise CommandError(f"{drifted} balance(s) out of sync")
+        else:
+            self.stdout.write(self.style.SUCCESS("all balances match"))
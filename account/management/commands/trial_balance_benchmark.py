@@ -0,0 +1,87 @@
+import datetime
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from account.models import Account, Journal, JournalEntry, JournalItems
+from account.views import trial_balance
+
+BENCHMARK_ACCOUNTS = 50
+ITEMS_PER_ENTRY = 2
+
+
+class Command(BaseCommand):
+    help = "Time trial_balance() against the current database, or against growing synthetic volumes with --items"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--date-from")
+        parser.add_argument("--date-to")
+        parser.add_argument("--journal")
+        parser.add_argument("--items", help="comma separated journal item counts, e.g. 1000,10000,100000; "
+                                            "seeded into a throwaway database that is dropped afterwards")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        filters = {
+            "date_from": options["date_from"],
+            "date_to": options["date_to"],
+            "journal": options["journal"],
+        }
+        if not options["items"]:
+            self.report(filters, options["runs"])
+            return
+
+        try:
+            sizes = sorted({int(size) for size in options["items"].split(",")})
+        except ValueError:
+            raise CommandError("--items must be a comma separated list of numbers") from None
+
+        # never seed into the configured database
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            journal = Journal.objects.create(journal_name="Benchmark", type="General")
+            accounts = [
+                Account.objects.create(name=f"Benchmark {i}", account_Type="asset", category="current", description="")
+                for i in range(BENCHMARK_ACCOUNTS)
+            ]
+            for size in sizes:
+                self.seed(journal, accounts, size - JournalItems.objects.count(), options["batch_size"])
+                self.report(filters, options["runs"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, journal, accounts, count, batch_size):
+        """Top up with balanced two-line entries spread over the last few years"""
+        start = JournalEntry.objects.count()
+        for offset in range(0, max(count, 0) // ITEMS_PER_ENTRY, batch_size):
+            numbers = range(start + offset, start + min(offset + batch_size, count // ITEMS_PER_ENTRY))
+            # bulk_create skips save(), so references and balances are not maintained here
+            entries = JournalEntry.objects.bulk_create([
+                JournalEntry(journal=journal, reference=f"BENCH{n}", status="posted",
+                             accounting_date=datetime.date(2023, 1, 1) + datetime.timedelta(days=n % 1000))
+                for n in numbers
+            ])
+            items = []
+            for n, entry in zip(numbers, entries):
+                amount = Decimal(n % 500 + 1)
+                items.append(JournalItems(journalentry=entry, account=accounts[n % len(accounts)], debit=amount))
+                items.append(JournalItems(journalentry=entry, account=accounts[(n + 1) % len(accounts)], credit=amount))
+            JournalItems.objects.bulk_create(items)
+
+    def report(self, filters, runs):
+        timings = []
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                trial_balance(**filters)
+                timings.append(time.perf_counter() - start)
+
+        self.stdout.write(f"accounts: {Account.objects.count()}")
+        self.stdout.write(f"journal items: {JournalItems.objects.count()}")
+        self.stdout.write(f"queries per run: {len(ctx.captured_queries)}")
+        self.stdout.write(f"best: {min(timings) * 1000:.1f} ms  avg: {sum(timings) / len(timings) * 1000:.1f} ms")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:56
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    DocumentSequence = apps.get_model('account', 'DocumentSequence')
+    sources = [
+        ('account', apps.get_model('account', 'Account'), 'code', 4, 1000),
+        ('journal', apps.get_model('account', 'Journal'), 'code', 4, 1001),
+        ('journal_entry', apps.get_model('account', 'JournalEntry'), 'reference', 6, 10011),
+    ]
+    for name, model, field, padding, start in sources:
+        used = [int(value) for value in model.objects.values_list(field, flat=True) if value and value.isdigit()]
+        DocumentSequence.objects.get_or_create(
+            name=name,
+            defaults={'padding': padding, 'next_value': max(used) + 1 if used else start},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0053_vendor_payment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('prefix', models.CharField(blank=True, default='', max_length=20)),
+                ('padding', models.PositiveSmallIntegerField(default=4)),
+                ('next_value', models.PositiveBigIntegerField(default=1)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0054_documentsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer_payment',
+            index=models.Index(fields=['-payment_date', '-id'], name='customerpayment_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customers',
+            index=models.Index(fields=['email'], name='customer_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customers',
+            index=models.Index(fields=['name'], name='customer_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['accounting_date', 'id'], name='journalentry_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalitems',
+            index=models.Index(fields=['account', 'journalentry', 'debit', 'credit'], name='journalitem_account_entry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseinvoice',
+            index=models.Index(fields=['-invoice_Date', '-id'], name='purchaseinvoice_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesinvoice',
+            index=models.Index(fields=['-invoice_Date', '-id'], name='salesinvoice_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['email'], name='vendor_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['name'], name='vendor_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor_payment',
+            index=models.Index(fields=['-payment_date', '-id'], name='vendorpayment_date_idx'),
+        ),
+    ]
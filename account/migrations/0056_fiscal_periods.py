@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0055_ledger_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FiscalPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('is_closed', models.BooleanField(default=False)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_closed', 'end_date'], name='fiscalperiod_closed_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountPeriodBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=15)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='account.account')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='account.fiscalperiod')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('period', 'account'), name='unique_period_account_balance')],
+            },
+        ),
+    ]
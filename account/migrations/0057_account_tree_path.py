@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:04
+
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Account = apps.get_model('account', 'Account')
+    children = {}
+    for pk, parent_id in Account.objects.values_list('id', 'parent_id'):
+        children.setdefault(parent_id, []).append(pk)
+
+    updates = []
+    pending = [(pk, '/', 0) for pk in children.get(None, [])]
+    while pending:
+        pk, parent_path, depth = pending.pop()
+        path = f'{parent_path}{pk}/'
+        updates.append(Account(id=pk, path=path, depth=depth))
+        pending.extend((child, path, depth + 1) for child in children.get(pk, []))
+    Account.objects.bulk_update(updates, ['path', 'depth'], batch_size=500)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0056_fiscal_periods'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:30
+
+import datetime
+
+from django.db import migrations
+
+
+DUE_DATE_CHUNK_SIZE = 1000
+
+
+def derive_due_dates(apps, schema_editor):
+    purchaseinvoice = apps.get_model('account', 'purchaseinvoice')
+    bills = (purchaseinvoice.objects.filter(Due_Date__isnull=True)
+             .select_related('vendor').only('id', 'invoice_Date', 'vendor__payment').order_by('id'))
+    last_id = 0
+    while True:
+        # keyset chunks, each written before the next is read, so memory stays flat
+        chunk = list(bills.filter(id__gt=last_id)[:DUE_DATE_CHUNK_SIZE])
+        if not chunk:
+            break
+        for bill in chunk:
+            bill.Due_Date = bill.invoice_Date + datetime.timedelta(days=bill.vendor.payment or 0)
+        purchaseinvoice.objects.bulk_update(chunk, ['Due_Date'], batch_size=500)
+        last_id = chunk[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0057_account_tree_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(derive_due_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0059_invoice_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseinvoice',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='salesinvoice',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
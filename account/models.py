@@ -1,13 +1,85 @@
-from django.db import models
+import datetime
+import threading
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models,transaction
 from decimal import Decimal
-from django.db.models import Sum
+from django.db.models import Sum,F,Case,When,Value
+from django.db.models.functions import Coalesce,Concat,Substr
 from django.utils import timezone
-from django.db.models.signals import post_save,post_delete
+from django.utils.dateparse import parse_date
+from django.db.models.signals import post_save,post_delete,pre_save,pre_delete
 from django.dispatch import receiver
 
 # Create your models here.
 
 
+class DocumentSequence(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    prefix = models.CharField(max_length=20, blank=True, default="")
+    padding = models.PositiveSmallIntegerField(default=4)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name}-{self.prefix}{self.next_value}"
+
+    def format(self, value):
+        return f"{self.prefix}{str(value).zfill(self.padding)}"
+
+
+SEQUENCE_DEFAULTS = {
+    "account": {"padding": 4, "next_value": 1000},
+    "journal": {"padding": 4, "next_value": 1001},
+    "journal_entry": {"padding": 6, "next_value": 10011},
+}
+
+
+def reserve_numbers(name, count=1):
+    """Allocate count consecutive codes from a named sequence.
+
+    The counter is bumped with a single UPDATE before it is read, so the row
+    stays locked until the surrounding transaction ends and parallel workers
+    never receive the same block.
+    """
+    if count < 1:
+        return []
+
+    # no savepoint: a failure here aborts the caller's transaction anyway
+    with transaction.atomic(savepoint=False):
+        bumped = DocumentSequence.objects.filter(name=name).update(next_value=F("next_value") + count)
+        if not bumped:
+            DocumentSequence.objects.get_or_create(name=name, defaults=SEQUENCE_DEFAULTS.get(name, {}))
+            DocumentSequence.objects.filter(name=name).update(next_value=F("next_value") + count)
+        sequence = DocumentSequence.objects.get(name=name)
+
+    first = sequence.next_value - count
+    return [sequence.format(value) for value in range(first, first + count)]
+
+
+def next_number(name):
+    return reserve_numbers(name)[0]
+
+
+@contextmanager
+def numbered(instance, field, name):
+    """Fill a blank field from the sequence in the same transaction as the write.
+
+    If the write fails the counter rolls back with it and the field is cleared,
+    so no number is lost and a retry draws a fresh one.
+    """
+    blank = getattr(instance, field)
+    try:
+        with transaction.atomic():
+            if not blank:
+                setattr(instance, field, next_number(name))
+            yield
+    except BaseException:
+        if not blank:
+            setattr(instance, field, blank)
+        raise
+
+
 class AccountType(models.TextChoices):
     ASSET ="asset","asset"
     LIABILITY ="liability","liability"
@@ -25,19 +97,91 @@ class Account(models.Model):
     balance = models.DecimalField(max_digits=15,decimal_places=2,default=0)
     description = models.TextField()
     is_active = models.BooleanField(default=True)
+    # materialized path of ids from the root, e.g. "/1/7/42/"; a subtree is the range [path, path + "~")
+    path = models.CharField(max_length=255, blank=True, default="", editable=False, db_index=True)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     
     def __str__(self):
             return f"{self.id}-{self.code} - {self.name}-{self.category}"
     
     def save(self,*args,**kwargs):
-        if not self.code:
-            first_account = Account.objects.order_by("-id").first()
-            if first_account and first_account.code.isdigit():
-                next_code =int(first_account.code)+ 1
-                self.code = str(next_code).zfill(4)
-            else:
-                self.code ="1000"
-        super().save(*args, **kwargs)           
+        with numbered(self, "code", "account"):
+            super().save(*args, **kwargs)
+            self.update_tree_path()
+
+    def update_tree_path(self):
+        """Keep path/depth in step with parent; a move rewrites the whole subtree in one UPDATE"""
+        parent_path = "/"
+        if self.parent_id:
+            parent_path = Account.objects.filter(pk=self.parent_id).values_list("path", flat=True).get()
+        new_path = f"{parent_path}{self.pk}/"
+        if new_path == self.path:
+            return
+
+        old_path = self.path
+        if old_path and parent_path.startswith(old_path):
+            raise ValueError("an account cannot be moved under itself or one of its descendants")
+
+        depth = new_path.count("/") - 2
+        if old_path:
+            Account.objects.filter(**subtree_range(old_path)).update(
+                path=Concat(Value(new_path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (depth - self.depth),
+            )
+        else:
+            Account.objects.filter(pk=self.pk).update(path=new_path, depth=depth)
+        self.path, self.depth = new_path, depth
+
+    def subtree(self):
+        return Account.objects.filter(**subtree_range(self.path))
+
+
+# "~" sorts after every digit and "/", so a subtree is a plain indexed range scan on path
+TREE_PATH_END = "~"
+
+
+def subtree_range(path, prefix=""):
+    """Lookups selecting every account under path (inclusive); path may be a string or OuterRef"""
+    if isinstance(path, str):
+        end = path + TREE_PATH_END
+    else:
+        end = Concat(path, Value(TREE_PATH_END), output_field=models.CharField())
+    return {f"{prefix}path__gte": path, f"{prefix}path__lt": end}
+
+
+# -------------------------
+# POSTING RULES
+# -------------------------
+_posting_accounts = {}
+_posting_accounts_lock = threading.Lock()
+
+
+def posting_accounts(document_type):
+    """(debit, credit) accounts for a document type, cached until any Account changes"""
+    rules = settings.ACCOUNT_POSTING_RULES[document_type]
+    codes = (rules["debit"], rules["credit"])
+
+    # read through a local mapping so a concurrent clear cannot empty the cache mid-lookup
+    with _posting_accounts_lock:
+        found = {code: _posting_accounts[code] for code in codes if code in _posting_accounts}
+    missing = [code for code in codes if code not in found]
+    if missing:
+        loaded = {account.code: account for account in Account.objects.filter(code__in=missing)}
+        for code in missing:
+            if code not in loaded:
+                raise Account.DoesNotExist(f"posting account {code} for {document_type} does not exist")
+        found.update(loaded)
+        with _posting_accounts_lock:
+            _posting_accounts.update(loaded)
+
+    return found[codes[0]], found[codes[1]]
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def clear_posting_accounts(sender, **kwargs):
+    with _posting_accounts_lock:
+        _posting_accounts.clear()
 
 
 class JournalType(models.TextChoices):
@@ -62,14 +206,8 @@ class Journal(models.Model):
         return f"{self.code}-{self.journal_name}--{self.id}"
     
     def save(self, *args,**kwargs):
-        if not self.code:
-            journal_code = Journal.objects.order_by("-id").first()
-            if journal_code and journal_code.code.isdigit():
-                next_code =int(journal_code.code)+1
-                self.code = str(next_code).zfill(4)
-            else:
-                self.code ="1001"    
-        super().save(*args,**kwargs)
+        with numbered(self, "code", "journal"):
+            super().save(*args,**kwargs)
 
 
 class JournalEntryStatus(models.TextChoices):
@@ -84,6 +222,12 @@ class JournalEntry(models.Model):
     status = models.CharField(max_length=20, choices=JournalEntryStatus.choices, default="Draft")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # general ledger keyset order
+            models.Index(fields=["accounting_date", "id"], name="journalentry_date_idx"),
+        ]
+
     def __str__(self):
         return self.journal.journal_name
 
@@ -94,7 +238,8 @@ class JournalEntry(models.Model):
         return self.items.aggregate(total=models.Sum('credit'))['total'] or Decimal("0.00")
 
     def is_balanced(self):
-        return self.total_debits() == self.total_credits()
+        totals = self.items.aggregate(debit=models.Sum('debit'), credit=models.Sum('credit'))
+        return (totals['debit'] or Decimal("0.00")) == (totals['credit'] or Decimal("0.00"))
 
     def post(self):
         if self.status == "posted":
@@ -102,29 +247,32 @@ class JournalEntry(models.Model):
         if not self.is_balanced():
             raise ValueError("Journal Entry is not balanced")
 
-        for item in self.items.all():
-            if item.debit and item.debit > 0:
-                item.account.balance += item.debit
-            if item.credit and item.credit > 0:
-                item.account.balance -= item.credit
-            item.account.save()
+        # account balances already moved when the items were saved
 
         self.status =JournalEntryStatus.POSTED
         self.save()
        
     def save(self, *args,**kwargs):
-        if not self.reference:
-            journalentry_reference = JournalEntry.objects.order_by("-id").first()
-            if journalentry_reference and journalentry_reference.reference.isdigit():
-                next_code =int(journalentry_reference.reference)+1
-                self.reference = str(next_code).zfill(6)
-            else:
-                self.reference ="10011"   
-        super().save(*args,**kwargs)
+        dates = [self.accounting_date]
+        if self.pk:
+            # moving an entry out of a closed period would count its items in the snapshot and again after it
+            dates += JournalEntry.objects.filter(pk=self.pk).values_list("accounting_date", flat=True)
+        ensure_period_open(*dates)
+        with numbered(self, "reference", "journal_entry"):
+            super().save(*args,**kwargs)
 
 
 
     
+def with_entry_totals(queryset):
+    """Annotate total_debit/total_credit on journal entries, grouped in the same query"""
+    zero = Value(Decimal("0.00"))
+    return queryset.annotate(
+        total_debit=Coalesce(Sum("items__debit"), zero, output_field=models.DecimalField(max_digits=15, decimal_places=2)),
+        total_credit=Coalesce(Sum("items__credit"), zero, output_field=models.DecimalField(max_digits=15, decimal_places=2)),
+    )
+
+
 class JournalItems(models.Model):
     account =models.ForeignKey(Account,on_delete=models.CASCADE)
     journalentry =models.ForeignKey(JournalEntry,on_delete=models.CASCADE,related_name='items')
@@ -133,34 +281,242 @@ class JournalItems(models.Model):
     debit =models.DecimalField(max_digits=15,decimal_places=2,null=True,blank=True)
     credit =models.DecimalField(max_digits=15,decimal_places=2,null=True,blank=True)
 
+    class Meta:
+        indexes = [
+            # per-account ledger / trial balance reads without touching the table rows
+            models.Index(fields=["account", "journalentry", "debit", "credit"], name="journalitem_account_entry_idx"),
+        ]
+
     def __str__(self):
         return self.account.name
 
 
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
-
-
 # -------------------------
 # SIGNALS TO UPDATE BALANCE
 # -------------------------
-def update_account_balance(account):
-    """Recalculate account balance based on all journal items"""
-    total_debit = JournalItems.objects.filter(account=account).aggregate(Sum("debit"))["debit__sum"] or 0
-    total_credit = JournalItems.objects.filter(account=account).aggregate(Sum("credit"))["credit__sum"] or 0
-    account.balance = total_debit - total_credit
-    account.save()
+def item_amount(debit, credit):
+    return (debit or Decimal("0.00")) - (credit or Decimal("0.00"))
+
+
+def apply_balance_delta(account_id, delta):
+    """Shift one account's balance by delta without re-reading its journal items"""
+    if account_id and delta:
+        Account.objects.filter(pk=account_id).update(balance=F("balance") + delta)
+
+
+@receiver(pre_save, sender=JournalItems)
+def load_saved_state(sender, instance, **kwargs):
+    """Read the stored account/amount an update replaces; in-memory state may be stale or never loaded"""
+    instance._saved_state = None
+    if instance.pk is not None:
+        row = JournalItems.objects.filter(pk=instance.pk).values_list("account_id", "debit", "credit").first()
+        if row:
+            instance._saved_state = (row[0], item_amount(row[1], row[2]))
+
+
+@receiver(pre_save, sender=JournalItems)
+@receiver(pre_delete, sender=JournalItems)
+def lock_closed_period_items(sender, instance, **kwargs):
+    ensure_period_open(instance.journalentry.accounting_date)
 
 
 @receiver(post_save, sender=JournalItems)
-def update_balance_on_save(sender, instance, **kwargs):
-    update_account_balance(instance.account)
+def update_balance_on_save(sender, instance, created, **kwargs):
+    old_state = instance._saved_state
+    new_amount = item_amount(instance.debit, instance.credit)
+
+    if old_state is None:
+        apply_balance_delta(instance.account_id, new_amount)
+    else:
+        old_account_id, old_amount = old_state
+        if old_account_id == instance.account_id:
+            apply_balance_delta(instance.account_id, new_amount - old_amount)
+        else:
+            apply_balance_delta(old_account_id, -old_amount)
+            apply_balance_delta(instance.account_id, new_amount)
 
 
 @receiver(post_delete, sender=JournalItems)
 def update_balance_on_delete(sender, instance, **kwargs):
-    update_account_balance(instance.account)
+    apply_balance_delta(instance.account_id, -item_amount(instance.debit, instance.credit))
+
+
+
+def apply_balance_deltas(deltas, batch_size=500):
+    """Apply {account_id: delta} in grouped UPDATE ... CASE statements"""
+    add_deltas(Account, "balance", deltas, batch_size)
+
+
+def add_deltas(model, field, deltas, batch_size=500):
+    """Add {pk: delta} to a decimal column of model, one UPDATE ... CASE per batch"""
+    deltas = [(pk, delta) for pk, delta in deltas.items() if delta]
+    output_field = model._meta.get_field(field)
+    for start in range(0, len(deltas), batch_size):
+        batch = deltas[start:start + batch_size]
+        model.objects.filter(pk__in=[pk for pk, _ in batch]).update(**{
+            field: Coalesce(F(field), Value(Decimal("0.00")), output_field=output_field) + Case(
+                *[When(pk=pk, then=Value(delta)) for pk, delta in batch],
+                output_field=output_field,
+            )
+        })
+
 
+def post_entries_bulk(entries, batch_size=1000):
+    """Create and post many balanced journal entries in one transaction.
+
+    entries is a list of dicts with journal_id, accounting_date, description,
+    reference and items (account_id, partner, label, debit, credit).
+    JournalItems are bulk inserted so the per-item balance signals don't fire;
+    the account balances are moved once per account instead.
+    """
+    lock_date = closed_through()
+    if lock_date:
+        for data in entries:
+            if as_date(data.get("accounting_date") or timezone.now()) <= lock_date:
+                raise PeriodClosedError(f"accounting date {data.get('accounting_date')} is in a closed period")
+
+    with transaction.atomic():
+        references = iter(reserve_numbers("journal_entry", sum(1 for data in entries if not data.get("reference"))))
+
+        journal_entries = []
+        for data in entries:
+            reference = data.get("reference") or next(references)
+            journal_entries.append(JournalEntry(
+                journal_id=data["journal_id"],
+                accounting_date=data.get("accounting_date") or timezone.now().date(),
+                description=data.get("description"),
+                reference=reference,
+                status=JournalEntryStatus.POSTED,
+            ))
+        JournalEntry.objects.bulk_create(journal_entries, batch_size=batch_size)
+
+        items = []
+        deltas = {}
+        for je, data in zip(journal_entries, entries):
+            for item in data["items"]:
+                items.append(JournalItems(journalentry=je, **item))
+                deltas[item["account_id"]] = deltas.get(item["account_id"], Decimal("0.00")) + item_amount(item.get("debit"), item.get("credit"))
+        JournalItems.objects.bulk_create(items, batch_size=batch_size)
+
+        apply_balance_deltas(deltas)
+
+    return journal_entries
+
+
+
+# -------------------------
+# FISCAL PERIODS
+# -------------------------
+class PeriodClosedError(ValueError):
+    pass
+
+
+class FiscalPeriod(models.Model):
+    name = models.CharField(max_length=50)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_closed = models.BooleanField(default=False)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["is_closed", "end_date"], name="fiscalperiod_closed_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.start_date} - {self.end_date})"
+
+
+class AccountPeriodBalance(models.Model):
+    """Cumulative debit/credit of an account from the first entry through period.end_date"""
+    period = models.ForeignKey(FiscalPeriod, on_delete=models.CASCADE, related_name="balances")
+    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    debit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["period", "account"], name="unique_period_account_balance"),
+        ]
+
+    def __str__(self):
+        return f"{self.period}-{self.account_id}"
+
+
+def as_date(value):
+    if isinstance(value, str):
+        return parse_date(value)
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def latest_closed_period(on_or_before=None):
+    periods = FiscalPeriod.objects.filter(is_closed=True)
+    if on_or_before:
+        periods = periods.filter(end_date__lte=on_or_before)
+    return periods.order_by("-end_date").first()
+
+
+def closed_through():
+    """Last date covered by a closed period; nothing on or before it may be posted"""
+    return FiscalPeriod.objects.filter(is_closed=True).order_by("-end_date").values_list("end_date", flat=True).first()
+
+
+def ensure_period_open(*accounting_dates):
+    lock_date = closed_through()
+    if not lock_date:
+        return
+    for accounting_date in accounting_dates:
+        if as_date(accounting_date) <= lock_date:
+            raise PeriodClosedError(f"accounting date {accounting_date} is in a closed period")
+
+
+def balances_as_of(as_of=None, before=None):
+    """{account_id: [debit, credit]} as of a date, from the latest snapshot plus later journal items.
+
+    Pass as_of to include that day, or before to stop the day before it.
+    """
+    limit = as_date(before) - datetime.timedelta(days=1) if before else as_date(as_of)
+    snapshot = latest_closed_period(limit)
+
+    totals = {}
+    items = JournalItems.objects.all()
+    if snapshot:
+        for account_id, debit, credit in snapshot.balances.values_list("account_id", "debit", "credit"):
+            totals[account_id] = [debit, credit]
+        items = items.filter(journalentry__accounting_date__gt=snapshot.end_date)
+    if limit:
+        items = items.filter(journalentry__accounting_date__lte=limit)
+
+    for row in items.values("account_id").annotate(debit=Sum("debit"), credit=Sum("credit")):
+        current = totals.setdefault(row["account_id"], [Decimal("0.00"), Decimal("0.00")])
+        current[0] += row["debit"] or Decimal("0.00")
+        current[1] += row["credit"] or Decimal("0.00")
+    return totals
+
+
+def close_period(period):
+    """Snapshot every account's cumulative totals at period.end_date and lock the period"""
+    with transaction.atomic():
+        period = FiscalPeriod.objects.select_for_update().get(pk=period.pk)
+        if period.is_closed:
+            return period
+        if FiscalPeriod.objects.filter(is_closed=False, end_date__lt=period.start_date).exists():
+            raise PeriodClosedError("earlier periods must be closed first")
+
+        totals = balances_as_of(period.end_date)
+        AccountPeriodBalance.objects.bulk_create(
+            [
+                AccountPeriodBalance(period=period, account_id=account_id, debit=debit, credit=credit)
+                for account_id, (debit, credit) in totals.items()
+            ],
+            batch_size=1000,
+        )
+        period.is_closed = True
+        period.closed_at = timezone.now()
+        period.save(update_fields=["is_closed", "closed_at"])
+    return period
 
 
 class CustomerStatus(models.TextChoices):
@@ -188,6 +544,12 @@ class customers(models.Model):
     notes = models.TextField()
     website= models.URLField(max_length=100,null=True,blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["email"], name="customer_email_idx"),
+            models.Index(fields=["name"], name="customer_name_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name}-{self.id}"
     
@@ -219,6 +581,43 @@ class product(models.Model):
     def __str__(self):
         return f"{self.id}-{self.Name}"
 
+# -------------------------
+# INVOICE TOTALS
+# -------------------------
+_invoice_totals = threading.local()
+
+
+def line_total(lines):
+    """Sum(quantity * price) over invoice lines, computed in the database"""
+    total = lines.aggregate(total=Sum(F("quantity") * F("price"), output_field=models.DecimalField(max_digits=15, decimal_places=2)))["total"]
+    return total or Decimal("0.00")
+
+
+@contextmanager
+def defer_invoice_totals():
+    """Hold back line-signal recalculation and recompute each touched invoice once on exit"""
+    if getattr(_invoice_totals, "pending", None) is not None:
+        yield
+        return
+
+    pending = _invoice_totals.pending = {}
+    try:
+        yield
+    finally:
+        _invoice_totals.pending = None
+
+    for invoice, method in pending.values():
+        getattr(invoice, method)()
+
+
+def recalculate_invoice_total(invoice, method):
+    pending = getattr(_invoice_totals, "pending", None)
+    if pending is None:
+        getattr(invoice, method)()
+    else:
+        pending[(type(invoice), invoice.pk)] = (invoice, method)
+
+
 class PaymentTerms(models.TextChoices):
     payment ="Immediate payment","Immediate payment"
     Days= "15 Days","15 Days"
@@ -234,6 +633,32 @@ class InvoiceStatus(models.TextChoices):
     CANCELLED ="cancelled","cancelled"   
 
 
+class StaleDocumentError(ValueError):
+    """The document was posted or changed by someone else since it was loaded"""
+
+
+def claim_posting(instance, status_field, draft, posted):
+    """Flip a draft document to posted with one conditional UPDATE; only one concurrent poster wins"""
+    filters = {"pk": instance.pk, status_field: draft}
+    changes = {status_field: posted}
+    if hasattr(instance, "version"):
+        filters["version"] = instance.version
+        changes["version"] = F("version") + 1
+    if not type(instance).objects.filter(**filters).update(**changes):
+        raise StaleDocumentError(f"{type(instance).__name__} {instance.pk} was already posted or changed")
+
+
+def finish_posting(instance, status_field, posted, partner, balance_field="current_balance"):
+    """Mirror a committed posting on the in-memory objects"""
+    setattr(instance, status_field, posted)
+    if hasattr(instance, "version"):
+        instance.version += 1
+    field = instance._meta.get_field(partner)
+    if field.is_cached(instance):
+        getattr(instance, partner).refresh_from_db(fields=[balance_field])
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
 class salesInvoice(models.Model):
     customer = models.ForeignKey(customers, on_delete=models.CASCADE)
     invoice_Date = models.DateField(default=timezone.now)
@@ -242,18 +667,34 @@ class salesInvoice(models.Model):
     Status = models.CharField(max_length=20, choices=InvoiceStatus.choices, default=InvoiceStatus.DRAFT)
     total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     journals = models.ForeignKey(Journal, on_delete=models.CASCADE)
+    # bumped on every posting; a poster holding an older version loses the race
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-invoice_Date", "-id"], name="salesinvoice_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.id}--{self.customer.name}"
     
     def calculate_total(self):
-        self.total = sum([line.quantity * line.price for line in self.lines.all()])
-        self.save()
+        self.total = line_total(self.lines.all())
+        self.save(update_fields=["total"])
 
     def post(self):
         if self.Status != InvoiceStatus.DRAFT:
             return  
 
+        with transaction.atomic():
+            claim_posting(self, "Status", InvoiceStatus.DRAFT, InvoiceStatus.POSTED)
+            je = self.post_entry()
+            add_deltas(customers, "current_balance", {self.customer_id: self.total})
+
+        finish_posting(self, "Status", InvoiceStatus.POSTED, "customer")
+        return je
+
+    def post_entry(self):
         # create journal entry
         je = JournalEntry.objects.create(
             journal_id=self.journals.id if self.journals else None,
@@ -262,7 +703,7 @@ class salesInvoice(models.Model):
         )
 
         # Accounts Receivable
-        receivable = Account.objects.get(code="1000")
+        receivable, sales = posting_accounts("sales_invoice")
         JournalItems.objects.create(
             account=receivable,
             journalentry=je,
@@ -273,7 +714,6 @@ class salesInvoice(models.Model):
         )
 
         # Sales Revenue
-        sales = Account.objects.get(code="4000")
         JournalItems.objects.create(
             account=sales,
             journalentry=je,
@@ -285,14 +725,6 @@ class salesInvoice(models.Model):
 
         # Post JE
         je.post()
-
-        # Update invoice + customer balance
-        self.Status = InvoiceStatus.POSTED
-        self.save()
-
-        self.customer.current_balance = (self.customer.current_balance or Decimal("0.00")) + self.total
-        self.customer.save()
-
         return je
 
 
@@ -317,7 +749,8 @@ class InvoiceLine(models.Model):
 @receiver(post_save,sender=InvoiceLine) 
 @receiver(post_delete, sender=InvoiceLine)
 def update_invoice_total(sender, instance, **Kwargs):
-    instance.invoices.calculate_total()
+    if instance.invoices_id:
+        recalculate_invoice_total(instance.invoices, "calculate_total")
 
 class paymentstatus(models.TextChoices):
     PAID ="paid","paid"
@@ -333,13 +766,27 @@ class customer_payment(models.Model):
     reference = models.CharField(max_length=255,blank=True,null=True)
     status =models.CharField(max_length=20,choices=paymentstatus.choices)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-payment_date", "-id"], name="customerpayment_date_idx"),
+        ]
+
     def __str__(self):
         return f"payment{self.id}--{self.amount}"
     
     def post(self):
         if self.status != paymentstatus.DRAFT:
             return
-        
+
+        with transaction.atomic():
+            claim_posting(self, "status", paymentstatus.DRAFT, paymentstatus.PAID)
+            jep = self.post_entry()
+            add_deltas(customers, "current_balance", {self.customer_id: -self.amount})
+
+        finish_posting(self, "status", paymentstatus.PAID, "customer")
+        return jep
+
+    def post_entry(self):
         #create journal entry
         jep= JournalEntry.objects.create(
             journal_id =self.journal.id if self.journal else None,
@@ -347,7 +794,7 @@ class customer_payment(models.Model):
             status =JournalEntryStatus.DRAFT
         )
 
-        back_cash =Account.objects.get(code="1200")
+        back_cash, receivable = posting_accounts("customer_payment")
         JournalItems.objects.create(
             account =back_cash,
             journalentry=jep,
@@ -357,7 +804,6 @@ class customer_payment(models.Model):
             credit= Decimal("0.00")
             )
         
-        receivable= Account.objects.get(code='1000')
         JournalItems.objects.create(
             account =receivable,
             journalentry=jep,
@@ -370,14 +816,6 @@ class customer_payment(models.Model):
         )
 
         jep.post()
-
-        #update invoice +customer balance
-        self.status = paymentstatus.PAID
-        self.save()
-
-        self.customer.current_balance =(self.customer.current_balance or Decimal("0.00"))-self.amount
-        self.customer.save()
-
         return jep
 
 
@@ -402,6 +840,12 @@ class vendor(models.Model):
     status = models.CharField()
     notes = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["email"], name="vendor_email_idx"),
+            models.Index(fields=["name"], name="vendor_name_idx"),
+        ]
+
     def __str__(self):
         return f"{self.id}-{self.name}"
 
@@ -430,6 +874,10 @@ class PaymentTerms(models.TextChoices):
     fourty ="45 Days","45 Days"
     month = " End of following Month","End of following Month"
 
+def due_date(invoice_date, payment_days):
+    return as_date(invoice_date) + datetime.timedelta(days=payment_days or 0)
+
+
 class purchaseInvoiceStatus(models.TextChoices):
     POSTED="posted","posted"
     DRAFT="draft","draft" 
@@ -445,26 +893,48 @@ class purchaseinvoice(models.Model):
     Status = models.CharField(max_length=20, choices=InvoiceStatus.choices, default=InvoiceStatus.DRAFT)
     total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     journals = models.ForeignKey(Journal, on_delete=models.CASCADE)
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-invoice_Date", "-id"], name="purchaseinvoice_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.id}-{self.vendor.name}"
+
+    def save(self,*args,**kwargs):
+        # bills without an explicit due date fall due after the vendor's payment days
+        if not self.Due_Date and self.vendor_id:
+            self.Due_Date = due_date(self.invoice_Date, self.vendor.payment)
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "Due_Date"}
+        super().save(*args,**kwargs)
     
 
     def calculate_total_vendor(self):
-        self.total = sum([vendors.quantity * vendors.price for vendors in self.lines.all()])
-        self.save()
+        self.total = line_total(self.lines.all())
+        self.save(update_fields=["total"])
 
     def post(self):
         if self.Status != purchaseInvoiceStatus.DRAFT:
             return
-        
-        
+
+        with transaction.atomic():
+            claim_posting(self, "Status", purchaseInvoiceStatus.DRAFT, purchaseInvoiceStatus.POSTED)
+            jev = self.post_entry()
+            add_deltas(vendor, "current_balance", {self.vendor_id: self.total})
+
+        finish_posting(self, "Status", purchaseInvoiceStatus.POSTED, "vendor")
+        return jev
+
+    def post_entry(self):
         jev =JournalEntry.objects.create(
             journal_id =self.journals.id if self.journals  else None,
             description =f"bill {self.id}-{self.vendor.name}",
             status=JournalEntryStatus.DRAFT
     )
-        expense =Account.objects.get(code='5000')
+        expense, ap = posting_accounts("purchase_invoice")
         JournalItems.objects.create(
             account =expense,
             journalentry =jev,
@@ -474,7 +944,6 @@ class purchaseinvoice(models.Model):
             credit=Decimal("0.00")
         )
 
-        ap=Account.objects.get(code="2000")
         JournalItems.objects.create(
             account=ap,
             journalentry=jev,
@@ -486,15 +955,6 @@ class purchaseinvoice(models.Model):
         )
 
         jev.post()
-
-
-        #update invoice +vendor balance
-        self.Status =purchaseInvoiceStatus.POSTED
-        self.save()
-
-        self.vendor.current_balance = (self.vendor.current_balance or Decimal("0.00"))+self.total
-        self.vendor.save()
-
         return jev
 
         
@@ -516,7 +976,7 @@ class purchaseInvoiceLine(models.Model):
 @receiver(post_save,sender=purchaseInvoiceLine)   
 @receiver(post_delete,sender=purchaseInvoiceLine) 
 def update_purchaseinvoe_total(sender, instance,**kwargs):
-    instance.invoices.calculate_total_vendor()
+    recalculate_invoice_total(instance.invoices, "calculate_total_vendor")
 
 
 class vendorpaymentstatus(models.TextChoices):
@@ -533,13 +993,28 @@ class vendor_payment(models.Model):
     reference= models.CharField(max_length=255,blank=True,null=True)
     status =models.CharField(max_length=20,choices=vendorpaymentstatus.choices)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-payment_date", "-id"], name="vendorpayment_date_idx"),
+        ]
+
     def __str__(self):
         return f"bill{self.id}--{self.amount}"
     
     def post(self):
         if self.status != vendorpaymentstatus.DRAFT:
             return
-        
+
+        with transaction.atomic():
+            claim_posting(self, "status", vendorpaymentstatus.DRAFT, vendorpaymentstatus.PAID)
+            jeb = self.post_entry()
+            if self.vendors_id:
+                add_deltas(vendor, "current_balance", {self.vendors_id: -self.amount})
+
+        finish_posting(self, "status", vendorpaymentstatus.PAID, "vendors")
+        return jeb
+
+    def post_entry(self):
         jeb =JournalEntry.objects.create(
             journal_id = self.journal.id if self.journal else None,
             description=f"bill {self.id}-{self.vendors}",
@@ -547,7 +1022,7 @@ class vendor_payment(models.Model):
 
         )
 
-        bill = Account.objects.get(code='')
+        bill, bank = posting_accounts("vendor_payment")
         JournalItems.objects.create(
             account =bill,
             journalentry =jeb,
@@ -556,9 +1031,8 @@ class vendor_payment(models.Model):
             debit =self.amount,
             credit=Decimal("0.00")
         )
-        receivable= Account.objects.get(code='1000')
         JournalItems.objects.create(
-            account =receivable,
+            account =bank,
             journalentry=jeb,
             partner =self.vendors.name,
             label=f"payment{self.id}",
@@ -569,12 +1043,57 @@ class vendor_payment(models.Model):
         )
 
         jeb.post()
+        return jeb
 
-        #update invoice +customer balance
-        self.status = vendorpaymentstatus.PAID
-        self.save()
 
-        self.customer.current_balance =(self.customer.current_balance or Decimal("0.00"))-self.amount
-        self.customer.save()
 
-        return jeb
+
+# -------------------------
+# INVOICE IMPORTS
+# -------------------------
+class ImportStatus(models.TextChoices):
+    QUEUED = "queued","queued"
+    RUNNING = "running","running"
+    DONE = "done","done"
+    FAILED = "failed","failed"
+
+
+class InvoiceImport(models.Model):
+    """A bulk invoice upload processed by the background import worker"""
+    file_name = models.CharField(max_length=255)
+    path = models.CharField(max_length=500)
+    status = models.CharField(max_length=20, choices=ImportStatus.choices, default=ImportStatus.QUEUED)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    created_invoices = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.id}-{self.file_name}-{self.status}"
+
+
+# -------------------------
+# DASHBOARD CACHE
+# -------------------------
+DASHBOARD_CACHE_KEY = "account:dashboard"
+
+
+@receiver(post_save, sender=salesInvoice)
+@receiver(post_delete, sender=salesInvoice)
+@receiver(post_save, sender=purchaseinvoice)
+@receiver(post_delete, sender=purchaseinvoice)
+@receiver(post_save, sender=customer_payment)
+@receiver(post_delete, sender=customer_payment)
+@receiver(post_save, sender=vendor_payment)
+@receiver(post_delete, sender=vendor_payment)
+@receiver(post_save, sender=customers)
+@receiver(post_delete, sender=customers)
+@receiver(post_save, sender=vendor)
+@receiver(post_delete, sender=vendor)
+@receiver(post_save, sender=product)
+@receiver(post_delete, sender=product)
+def clear_dashboard_cache(sender, **kwargs):
+    cache.delete(DASHBOARD_CACHE_KEY)
@@ -0,0 +1,101 @@
+"""
+Reconcile the denormalized balances against the documents they are derived from.
+
+Account.balance is the sum of its journal items (debit - credit). customers and vendor
+current_balance is what was posted to them: posted invoices less paid payments. Each
+target table is walked in primary-key chunks and the derived values for a chunk come from
+grouped queries limited to that key range, so memory stays bounded however many lines exist.
+"""
+from contextlib import nullcontext
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from .models import (Account, InvoiceStatus, JournalItems, add_deltas, customer_payment, customers,
+                     paymentstatus, purchaseInvoiceStatus, purchaseinvoice, salesInvoice, vendor,
+                     vendor_payment, vendorpaymentstatus)
+
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def grouped_totals(queryset, key, field):
+    rows = queryset.order_by().values(key).annotate(total=Sum(field)).values_list(key, 'total')
+    return {pk: total or Decimal("0.00") for pk, total in rows}
+
+
+def account_balances(first, last):
+    items = JournalItems.objects.filter(account_id__gte=first, account_id__lte=last)
+    debits = grouped_totals(items, 'account_id', 'debit')
+    credits = grouped_totals(items, 'account_id', 'credit')
+    return {pk: debits.get(pk, Decimal("0.00")) - credits.get(pk, Decimal("0.00")) for pk in debits.keys() | credits.keys()}
+
+
+def partner_balances(invoices, payments, key, payment_key, first, last):
+    billed = grouped_totals(invoices.filter(**{f"{key}__gte": first, f"{key}__lte": last}), key, 'total')
+    paid = grouped_totals(payments.filter(**{f"{payment_key}__gte": first, f"{payment_key}__lte": last}), payment_key, 'amount')
+    return {pk: billed.get(pk, Decimal("0.00")) - paid.get(pk, Decimal("0.00")) for pk in billed.keys() | paid.keys()}
+
+
+def customer_balances(first, last):
+    return partner_balances(
+        salesInvoice.objects.filter(Status__in=[InvoiceStatus.POSTED, InvoiceStatus.PAID]),
+        customer_payment.objects.filter(status=paymentstatus.PAID),
+        'customer_id', 'customer_id', first, last,
+    )
+
+
+def vendor_balances(first, last):
+    return partner_balances(
+        purchaseinvoice.objects.filter(Status__in=[purchaseInvoiceStatus.POSTED, purchaseInvoiceStatus.PAID]),
+        vendor_payment.objects.filter(status=vendorpaymentstatus.PAID),
+        'vendor_id', 'vendors_id', first, last,
+    )
+
+
+# target: (model, stored field, label field, derived balances for a pk range)
+RECONCILE_TARGETS = {
+    "accounts": (Account, "balance", "code", account_balances),
+    "customers": (customers, "current_balance", "name", customer_balances),
+    "vendors": (vendor, "current_balance", "name", vendor_balances),
+}
+
+
+def reconcile_chunk(target, after, chunk_size, fix):
+    """(chunk pks, mismatches) for the chunk of target rows after pk; fix locks and corrects them"""
+    model, field, label, derive = RECONCILE_TARGETS[target]
+    with transaction.atomic() if fix else nullcontext():
+        rows = model.objects.filter(pk__gt=after).order_by('pk')
+        if fix:
+            # postings to these rows wait, so stored and derived values are read consistently
+            rows = rows.select_for_update()
+        chunk = list(rows.values_list('pk', label, field)[:chunk_size])
+        if not chunk:
+            return [], []
+
+        expected = derive(chunk[0][0], chunk[-1][0])
+        mismatches = []
+        for pk, name, stored in chunk:
+            value = expected.get(pk, Decimal("0.00"))
+            if (stored or Decimal("0.00")) != value:
+                mismatches.append({"target": target, "id": pk, "label": name, "stored": stored,
+                                   "expected": value, "difference": value - (stored or Decimal("0.00"))})
+
+        if fix and mismatches:
+            add_deltas(model, field, {row["id"]: row["difference"] for row in mismatches}, batch_size=chunk_size)
+
+    return [row[0] for row in chunk], mismatches
+
+
+def reconcile(target, chunk_size=RECONCILE_CHUNK_SIZE, fix=False):
+    """Yield every drifted row of target, one primary-key chunk at a time"""
+    if target not in RECONCILE_TARGETS:
+        raise ValueError(f"unknown reconcile target {target}")
+    after = 0
+    while True:
+        pks, mismatches = reconcile_chunk(target, after, chunk_size, fix)
+        yield from mismatches
+        # a short chunk was the end of the table
+        if len(pks) < chunk_size:
+            return
+        after = pks[-1]
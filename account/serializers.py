@@ -1,6 +1,9 @@
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 from .models import customers,vendor,Account,Journal,JournalEntry,JournalItems,customer_contact,product,InvoiceLine,salesInvoice,vendor_product,purchaseinvoice
-from .models import InvoiceStatus,purchaseInvoiceLine,purchaseInvoiceStatus,customer_payment,vendor_payment
+from .models import apply_balance_deltas,item_amount,InvoiceStatus,purchaseInvoiceLine,purchaseInvoiceStatus,customer_payment,vendor_payment
 
 
 
@@ -24,34 +27,103 @@ class JournalItemsSerializer(serializers.ModelSerializer):
         fields =["account","journalentry","partner","label","debit","credit"]
 
 
-class journalentrySerializer(serializers.ModelSerializer):
-    items = JournalItemsSerializer(many=True)
-    
+class JournalItemDetailSerializer(serializers.ModelSerializer):
+    account_code = serializers.CharField(source="account.code", read_only=True)
+    account_name = serializers.CharField(source="account.name", read_only=True)
+
+    class Meta:
+        model = JournalItems
+        fields = ["id","account","account_code","account_name","partner","label","debit","credit"]
+
+
+class journalentryDetailSerializer(serializers.ModelSerializer):
+    """Read side of a journal entry; expects with_entry_totals() and items prefetched with their accounts"""
+    journal_name = serializers.CharField(source="journal.journal_name", read_only=True)
+    items = JournalItemDetailSerializer(many=True, read_only=True)
+    total_debit = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+    total_credit = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
+
     class Meta:
         model = JournalEntry
-        fields = ["journal", "accounting_date", "description", "reference","items","status"]
+        fields = ["id","journal","journal_name","accounting_date","description","reference","status","items","total_debit","total_credit"]
 
-    def create(self ,validated_data):
-        item_data = validated_data.pop("items")
-    
 
-        journalentrys= JournalEntry.objects.create(**validated_data)
 
 
-        for item in item_data:
-            JournalItems.objects.create(journalentry=journalentrys,**item)
 
 
 
+def balance_tolerance(currency=None):
+    """Largest debit/credit difference accepted for an entry in currency (the books' currency by default)"""
+    currency = currency or getattr(settings, "ACCOUNT_CURRENCY", "INR")
+    return Decimal(str(getattr(settings, "JOURNAL_BALANCE_TOLERANCE", {}).get(currency, "0.00")))
 
-        if JournalItems.total_debits() != JournalItems.total.credits():
-            raise serializers.ValidationError("Journal Entry is no balanced (debit ≠ credit)")
 
-        return journalentrys    
+def validate_balanced(items, currency=None):
+    """Exact Decimal totals of the payload, checked before anything touches the database"""
+    debits = sum((item["debit"] for item in items), Decimal("0.00"))
+    credits = sum((item["credit"] for item in items), Decimal("0.00"))
+    if abs(debits - credits) > balance_tolerance(currency):
+        raise serializers.ValidationError(f"Journal Entry is no balanced (debit {debits} ≠ credit {credits})")
+
+
+class bulkJournalItemSerializer(serializers.Serializer):
+    account = serializers.IntegerField()
+    partner = serializers.CharField(max_length=100, required=False, allow_null=True, allow_blank=True)
+    label = serializers.CharField(max_length=255, required=False, allow_null=True, allow_blank=True)
+    debit = serializers.DecimalField(max_digits=15, decimal_places=2, required=False, default=Decimal("0.00"))
+    credit = serializers.DecimalField(max_digits=15, decimal_places=2, required=False, default=Decimal("0.00"))
+
 
+class bulkJournalEntrySerializer(serializers.Serializer):
+    """Plain-field entry payload for /journalentry_bulk/; ids are checked in bulk by the view"""
+    journal = serializers.IntegerField()
+    accounting_date = serializers.DateField(required=False)
+    description = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    reference = serializers.CharField(max_length=50, required=False, allow_null=True, allow_blank=True)
+    items = bulkJournalItemSerializer(many=True, allow_empty=False)
 
+    def validate(self, data):
+        validate_balanced(data["items"])
+        return data
 
 
+class journalentrySerializer(serializers.ModelSerializer):
+    items = bulkJournalItemSerializer(many=True, allow_empty=False)
+    
+    class Meta:
+        model = JournalEntry
+        fields = ["journal", "accounting_date", "description", "reference","items","status"]
+
+    def validate(self, data):
+        # balance first: an unbalanced payload is rejected before any account lookup or write
+        validate_balanced(data["items"])
+
+        account_ids = {item["account"] for item in data["items"]}
+        missing = account_ids - set(Account.objects.filter(id__in=account_ids).values_list("id", flat=True))
+        if missing:
+            raise serializers.ValidationError({"items": f"account id not found: {sorted(missing)}"})
+        return data
+
+    def create(self ,validated_data):
+        item_data = validated_data.pop("items")
+
+        with transaction.atomic():
+            journalentrys= JournalEntry.objects.create(**validated_data)
+
+            # one insert for all items; balances move once per account instead of per item signal
+            JournalItems.objects.bulk_create([
+                JournalItems(journalentry=journalentrys, account_id=item["account"], partner=item.get("partner"),
+                             label=item.get("label"), debit=item["debit"], credit=item["credit"])
+                for item in item_data
+            ])
+            deltas = {}
+            for item in item_data:
+                deltas[item["account"]] = deltas.get(item["account"], Decimal("0.00")) + item_amount(item["debit"], item["credit"])
+            apply_balance_deltas(deltas)
+
+        return journalentrys    
+
 
 class customersSerializer(serializers.ModelSerializer):
     class Meta:
@@ -87,14 +159,16 @@ class InvoiceSerializer(serializers.ModelSerializer):
     def create(self,validated_data):
         inv_lines_data =validated_data.pop('lines')
 
-        invoice_instance = salesInvoice.objects.create(**validated_data)
+        # a failed post rolls back the invoice and its lines instead of leaving a draft behind
+        with transaction.atomic():
+            invoice_instance = salesInvoice.objects.create(**validated_data)
 
-        for line in inv_lines_data:
-            InvoiceLine.objects.create(invoices=invoice_instance,**line)
+            # bulk_create skips the per-line signal, so the total is computed once below
+            InvoiceLine.objects.bulk_create([InvoiceLine(invoices=invoice_instance,**line) for line in inv_lines_data])
             invoice_instance.calculate_total()
 
-        if invoice_instance.Status == InvoiceStatus.DRAFT:
-            invoice_instance.post()
+            if invoice_instance.Status == InvoiceStatus.DRAFT:
+                invoice_instance.post()
           
 
         return invoice_instance    
@@ -108,8 +182,9 @@ class customer_paymentsSerializer(serializers.ModelSerializer):
         fields =['customer','invoice','payment_date','amount','journal','reference','status']
 
     def create(self, validated_data):
-        payment =customer_payment.objects.create(**validated_data)
-        payment.post()
+        with transaction.atomic():
+            payment =customer_payment.objects.create(**validated_data)
+            payment.post()
         return payment    
 
 
@@ -144,16 +219,16 @@ class purchaseinvoiceSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         lines= validated_data.pop('lines')
 
-        purchaseinvoice_instance =purchaseinvoice.objects.create(**validated_data)    
+        with transaction.atomic():
+            purchaseinvoice_instance =purchaseinvoice.objects.create(**validated_data)
 
-        for line in lines:
-            purchaseInvoiceLine.objects.create(invoices=purchaseinvoice_instance,**line)
+            purchaseInvoiceLine.objects.bulk_create([purchaseInvoiceLine(invoices=purchaseinvoice_instance,**line) for line in lines])
             purchaseinvoice_instance.calculate_total_vendor()
 
-        if purchaseinvoice_instance.Status == purchaseInvoiceStatus.DRAFT:
-            purchaseinvoice_instance.post()
+            if purchaseinvoice_instance.Status == purchaseInvoiceStatus.DRAFT:
+                purchaseinvoice_instance.post()
 
-            return purchaseinvoice_instance
+        return purchaseinvoice_instance
 
 
 class vendor_paymentSerializer(serializers.ModelSerializer):
@@ -162,6 +237,7 @@ class vendor_paymentSerializer(serializers.ModelSerializer):
         fields =["vendors","invoice","payment_date","amount","journal","reference","status"]
 
     def create(self, validated_data):
-        vendorpayment=vendor_payment.objects.create(**validated_data)
-        vendor_payment.post()
-        return vendor_payment    
\ No newline at end of file
+        with transaction.atomic():
+            vendorpayment=vendor_payment.objects.create(**validated_data)
+            vendorpayment.post()
+        return vendorpayment    
\ No newline at end of file
@@ -1,3 +1,1155 @@
-from django.test import TestCase
+import csv
+import datetime
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.db_router import ReportReplicaRouter, report_view
+
+from .imports import IMPORT_COLUMNS, import_worker, run_import
+from .models import (Account, AccountPeriodBalance, DocumentSequence, FiscalPeriod, InvoiceImport,
+                     InvoiceLine, Journal, JournalEntry, JournalItems, PeriodClosedError, StaleDocumentError, balances_as_of,
+                     close_period, customer_payment, customers, defer_invoice_totals, next_number,
+                     posting_accounts, product, purchaseinvoice, reserve_numbers, salesInvoice, vendor,
+                     vendor_payment)
+from .reconcile import reconcile
+from .serializers import InvoiceSerializer
+from .views import account_rollup, ap_aging, ar_aging, cash_forecast, dashboard_totals, financial_statement, trial_balance
+
+
+class TrialBalanceTests(TestCase):
+
+    def setUp(self):
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.bank = Account.objects.create(name="Bank", account_Type="asset", category="current", description="", parent=self.cash)
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+
+    def post_entry(self, debit_account, credit_account, amount, date="2025-01-15"):
+        entry = JournalEntry.objects.create(journal=self.journal, accounting_date=date)
+        JournalItems.objects.create(account=debit_account, journalentry=entry, debit=amount, credit=Decimal("0.00"))
+        JournalItems.objects.create(account=credit_account, journalentry=entry, debit=Decimal("0.00"), credit=amount)
+        return entry
+
+    def test_totals_and_tree(self):
+        self.post_entry(self.bank, self.sales, Decimal("100.00"))
+        self.post_entry(self.cash, self.sales, Decimal("50.00"))
+
+        data = trial_balance()
+
+        self.assertEqual(data["total_debits"], Decimal("150.00"))
+        self.assertEqual(data["total_creditd"], Decimal("150.00"))
+        self.assertEqual([row["account"] for row in data["rows"]], ["Cash", "Bank", "Sales"])
+        cash_node = next(node for node in data["tree"] if node["id"] == self.cash.id)
+        self.assertEqual([child["id"] for child in cash_node["children"]], [self.bank.id])
+
+    def test_date_and_journal_filters(self):
+        self.post_entry(self.cash, self.sales, Decimal("100.00"), date="2025-01-15")
+        self.post_entry(self.cash, self.sales, Decimal("40.00"), date="2025-03-01")
+
+        data = trial_balance(date_from="2025-02-01")
+        self.assertEqual(data["total_debits"], Decimal("40.00"))
+        self.assertEqual(len(data["rows"]), 3)
+
+        other = Journal.objects.create(journal_name="Bank", type="Bank")
+        self.assertEqual(trial_balance(journal=other.id)["total_debits"], Decimal("0.00"))
+
+    def test_view_rejects_bad_params(self):
+        client = APIClient()
+        for params in ({"journal": "abc"}, {"date_from": "abc"}, {"date_to": "2025-02-30"}):
+            self.assertEqual(client.get("/account/trial_balance_view/", params).status_code, 400)
+        self.assertEqual(client.get("/account/trial_balance_view/", {"date_to": "2025-01-31"}).status_code, 200)
+
+    def test_query_count_independent_of_account_count(self):
+        self.post_entry(self.cash, self.sales, Decimal("10.00"))
+        # closed-period snapshot lookup + the grouped aggregate
+        with self.assertNumQueries(2):
+            trial_balance()
+
+        Account.objects.bulk_create(
+            Account(code=f"9{i:04d}", name=f"Extra {i}", account_Type="expense", category="misc", description="")
+            for i in range(200)
+        )
+        with self.assertNumQueries(2):
+            data = trial_balance()
+        self.assertEqual(len(data["rows"]), 203)
+
+
+class AccountBalanceTests(TestCase):
+
+    def setUp(self):
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+        self.entry = JournalEntry.objects.create(journal=self.journal)
+
+    def balances(self):
+        self.cash.refresh_from_db()
+        self.sales.refresh_from_db()
+        return self.cash.balance, self.sales.balance
+
+    def test_insert_update_delete_apply_deltas(self):
+        debit = JournalItems.objects.create(account=self.cash, journalentry=self.entry, debit=Decimal("100.00"))
+        JournalItems.objects.create(account=self.sales, journalentry=self.entry, credit=Decimal("100.00"))
+        self.assertEqual(self.balances(), (Decimal("100.00"), Decimal("-100.00")))
+
+        debit.debit = Decimal("80.00")
+        debit.save()
+        self.assertEqual(self.balances(), (Decimal("80.00"), Decimal("-100.00")))
+
+        debit = JournalItems.objects.get(pk=debit.pk)
+        debit.account = self.sales
+        debit.save()
+        self.assertEqual(self.balances(), (Decimal("0.00"), Decimal("-20.00")))
+
+        debit.delete()
+        self.assertEqual(self.balances(), (Decimal("0.00"), Decimal("-100.00")))
+
+    def test_unloaded_and_repeated_saves_do_not_double_count(self):
+        item = JournalItems.objects.create(account=self.cash, journalentry=self.entry, debit=Decimal("30.00"))
+        item.save()
+        item.save()
+        self.assertEqual(self.balances()[0], Decimal("30.00"))
+
+        JournalItems(pk=item.pk, account=self.cash, journalentry=self.entry, debit=Decimal("45.00")).save()
+        self.assertEqual(self.balances()[0], Decimal("45.00"))
+
+    def test_insert_does_not_scan_history(self):
+        for _ in range(20):
+            JournalItems.objects.create(account=self.cash, journalentry=self.entry, debit=Decimal("1.00"))
+        # period lock check, insert, balance delta
+        with self.assertNumQueries(3):
+            JournalItems.objects.create(account=self.cash, journalentry=self.entry, debit=Decimal("1.00"))
+
+    def test_post_does_not_double_count(self):
+        JournalItems.objects.create(account=self.cash, journalentry=self.entry, debit=Decimal("50.00"))
+        JournalItems.objects.create(account=self.sales, journalentry=self.entry, credit=Decimal("50.00"))
+        self.entry.post()
+        self.assertEqual(self.balances(), (Decimal("50.00"), Decimal("-50.00")))
+
+    def test_rebuild_command_fixes_drift(self):
+        JournalItems.objects.create(account=self.cash, journalentry=self.entry, debit=Decimal("50.00"))
+        Account.objects.filter(pk=self.cash.pk).update(balance=Decimal("7.00"))
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_account_balances", "--verify", stdout=StringIO())
+        call_command("rebuild_account_balances", stdout=StringIO())
+        self.assertEqual(self.balances()[0], Decimal("50.00"))
+
+
+class JournalEntryBulkTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+
+    def entry(self, amount):
+        return {
+            "journal": self.journal.id,
+            "accounting_date": "2025-01-31",
+            "items": [
+                {"account": self.cash.id, "debit": amount},
+                {"account": self.sales.id, "credit": amount},
+            ],
+        }
+
+    def test_bulk_post_updates_balances_once(self):
+        entries = [self.entry("10.00") for _ in range(50)]
+        with self.assertNumQueries(10):
+            response = self.client.post("/account/journalentry_bulk/", {"entries": entries}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(JournalEntry.objects.filter(status="posted").count(), 50)
+        self.assertEqual(JournalItems.objects.count(), 100)
+        self.assertEqual(len(set(JournalEntry.objects.values_list("reference", flat=True))), 50)
+        self.cash.refresh_from_db()
+        self.sales.refresh_from_db()
+        self.assertEqual((self.cash.balance, self.sales.balance), (Decimal("500.00"), Decimal("-500.00")))
+
+    def test_unbalanced_or_unknown_rejected_without_writes(self):
+        unbalanced = self.entry("10.00")
+        unbalanced["items"][1]["credit"] = "9.00"
+        response = self.client.post("/account/journalentry_bulk/", {"entries": [unbalanced]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        unknown = self.entry("10.00")
+        unknown["items"][0]["account"] = 999999
+        response = self.client.post("/account/journalentry_bulk/", {"entries": [unknown]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["accounts"], [999999])
+        self.assertFalse(JournalEntry.objects.exists())
+
+
+class GeneralLedgerTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+        for day in range(1, 11):
+            entry = JournalEntry.objects.create(journal=self.journal, accounting_date=f"2025-01-{day:02d}")
+            JournalItems.objects.create(account=self.cash, journalentry=entry, debit=Decimal(day))
+            JournalItems.objects.create(account=self.sales, journalentry=entry, credit=Decimal(day))
+
+    def test_keyset_pages_carry_running_balance(self):
+        url = f"/account/genaral_ledger/{self.cash.id}/"
+        first = self.client.get(url, {"limit": 4}).data
+        self.assertTrue(first["has_more"])
+        self.assertEqual([row["balance"] for row in first["results"]], [1, 3, 6, 10])
+
+        with self.assertNumQueries(1):
+            second = self.client.get(url, {"limit": 4, "cursor": first["next_cursor"]}).data
+        self.assertEqual([row["balance"] for row in second["results"]], [15, 21, 28, 36])
+
+        last = self.client.get(url, {"limit": 4, "cursor": second["next_cursor"]}).data
+        self.assertFalse(last["has_more"])
+        self.assertIsNone(last["next_cursor"])
+        self.assertEqual(last["results"][-1]["balance"], 55)
+
+    def test_date_filter_opening_balance(self):
+        data = self.client.get(f"/account/genaral_ledger/{self.cash.id}/", {"date_from": "2025-01-05", "date_to": "2025-01-06"}).data
+        self.assertEqual(data["opening_balance"], Decimal("10.00"))
+        self.assertEqual([row["balance"] for row in data["results"]], [15, 21])
+
+    def test_tampered_cursor_rejected(self):
+        response = self.client.get(f"/account/genaral_ledger/{self.cash.id}/", {"cursor": "bogus"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_limit_below_one_rejected(self):
+        for limit in (0, -3):
+            response = self.client.get(f"/account/genaral_ledger/{self.cash.id}/", {"limit": limit})
+            self.assertEqual(response.status_code, 400)
+
+    def test_bad_dates_rejected(self):
+        for params in ({"date_from": "abc"}, {"date_to": "2025-02-30"}):
+            self.assertEqual(self.client.get(f"/account/genaral_ledger/{self.cash.id}/", params).status_code, 400)
+
+
+class CsvExportTests(TestCase):
+
+    def setUp(self):
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        entry = JournalEntry.objects.create(journal=self.journal, accounting_date="2025-02-01")
+        JournalItems.objects.create(account=self.cash, journalentry=entry, partner="Acme", debit=Decimal("5.00"))
+
+    def read_csv(self, response):
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_journal_items_export_streams_with_filters(self):
+        lines = self.read_csv(self.client.get("/account/journal_items_export/", {"account": self.cash.id}))
+        self.assertEqual(lines[0], "reference,accounting_date,journal,account_code,account_name,partner,label,debit,credit")
+        self.assertEqual(len(lines), 2)
+        self.assertIn("Acme", lines[1])
+
+        lines = self.read_csv(self.client.get("/account/journal_items_export/", {"date_from": "2025-03-01"}))
+        self.assertEqual(len(lines), 1)
+
+    def test_bad_filters_rejected_before_streaming(self):
+        for url, params in (("/account/journal_items_export/", {"account": "abc"}),
+                            ("/account/journal_items_export/", {"date_to": "2025-02-30"}),
+                            ("/account/invoice_export/", {"customer": "x"}),
+                            ("/account/vendor_invoice_export/", {"date_from": "abc"})):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.streaming)
+
+    def test_customer_export_filters_by_status(self):
+        customers.objects.create(name="Active", status="active", notes="")
+        customers.objects.create(name="Gone", status="inactive", notes="")
+        lines = self.read_csv(self.client.get("/account/customer_export/", {"status": "inactive"}))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith("Gone,"))
+
+
+class InvoiceTotalTests(TestCase):
+
+    def setUp(self):
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.customer = customers.objects.create(name="Acme", notes="")
+        Account.objects.create(code="1000", name="Receivable", account_Type="asset", category="current", description="")
+        Account.objects.create(code="4000", name="Sales", account_Type="income", category="revenue", description="")
+
+    def payload(self, count):
+        return {
+            "customer": self.customer.id,
+            "payments_terms": "30 Days",
+            "journals": self.journal.id,
+            "lines": [{"quantity": "2.00", "price": "1.50"} for _ in range(count)],
+        }
+
+    def create_invoice(self, count):
+        serializer = InvoiceSerializer(data=self.payload(count))
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with CaptureQueriesContext(connection) as ctx:
+            invoice = serializer.save()
+        return invoice, len(ctx.captured_queries)
+
+    def test_create_cost_does_not_grow_with_lines(self):
+        small, small_queries = self.create_invoice(3)
+        large, large_queries = self.create_invoice(300)
+        # only the batched line INSERT grows (SQLite caps rows per statement)
+        self.assertLessEqual(large_queries, small_queries + 2)
+        large.refresh_from_db()
+        self.assertEqual(large.total, Decimal("900.00"))
+        self.assertEqual(large.Status, "posted")
+
+    def test_deferred_totals_recompute_once(self):
+        invoice = salesInvoice.objects.create(customer=self.customer, payments_terms="30 Days", journals=self.journal, Status="posted")
+        with defer_invoice_totals():
+            for _ in range(10):
+                InvoiceLine.objects.create(invoices=invoice, quantity=Decimal("1.00"), price=Decimal("2.00"))
+            invoice.refresh_from_db()
+            self.assertEqual(invoice.total, Decimal("0.00"))
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.total, Decimal("20.00"))
+
+        InvoiceLine.objects.filter(invoices=invoice).first().delete()
+        invoice.refresh_from_db()
+        self.assertEqual(invoice.total, Decimal("18.00"))
+
+
+class PostingAccountsTests(TestCase):
+
+    def setUp(self):
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.customer = customers.objects.create(name="Acme", notes="")
+        self.receivable = Account.objects.create(code="1000", name="Receivable", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(code="4000", name="Sales", account_Type="income", category="revenue", description="")
+
+    def test_lookups_are_cached_until_accounts_change(self):
+        self.assertEqual(posting_accounts("sales_invoice"), (self.receivable, self.sales))
+        with self.assertNumQueries(0):
+            posting_accounts("sales_invoice")
+
+        other = Account.objects.create(code="4100", name="Other sales", account_Type="income", category="revenue", description="")
+        with self.settings(ACCOUNT_POSTING_RULES={"sales_invoice": {"debit": "1000", "credit": "4100"}}):
+            with self.assertNumQueries(1):
+                self.assertEqual(posting_accounts("sales_invoice"), (self.receivable, other))
+
+    def test_invoice_post_uses_cached_accounts(self):
+        posting_accounts("sales_invoice")
+        invoice = salesInvoice.objects.create(customer=self.customer, payments_terms="30 Days", journals=self.journal, total=Decimal("25.00"))
+        with CaptureQueriesContext(connection) as ctx:
+            invoice.post()
+        self.assertFalse(any('FROM "account_account" WHERE "account_account"."code"' in q["sql"] for q in ctx.captured_queries))
+        self.receivable.refresh_from_db()
+        self.assertEqual(self.receivable.balance, Decimal("25.00"))
+
+
+class DocumentSequenceTests(TestCase):
+
+    def test_codes_come_from_the_sequence_without_reading_latest_row(self):
+        journal = Journal.objects.create(journal_name="General", type="General")
+        self.assertEqual(journal.code, "1001")
+        # period lock check, then the sequence update/read and the insert
+        with self.assertNumQueries(6):
+            entry = JournalEntry.objects.create(journal=journal)
+        self.assertEqual(entry.reference, "010011")
+        self.assertEqual(JournalEntry.objects.create(journal=journal).reference, "010012")
+
+    def test_failed_insert_does_not_consume_a_number(self):
+        Journal.objects.create(journal_name="General", type="General")
+        Journal.objects.create(journal_name="Manual", type="General", code="1002")
+        journal = Journal(journal_name="Bank", type="Bank")
+        with self.assertRaises(IntegrityError):
+            journal.save()
+        self.assertEqual(journal.code, "")
+        self.assertEqual(DocumentSequence.objects.get(name="journal").next_value, 1002)
+
+    def test_reserve_block_is_contiguous_and_respects_prefix(self):
+        DocumentSequence.objects.create(name="invoice", prefix="INV-", padding=5, next_value=7)
+        self.assertEqual(reserve_numbers("invoice", 3), ["INV-00007", "INV-00008", "INV-00009"])
+        self.assertEqual(next_number("invoice"), "INV-00010")
+        self.assertEqual(reserve_numbers("invoice", 0), [])
+
+    def test_unknown_sequence_is_created_on_first_use(self):
+        self.assertEqual(reserve_numbers("receipt", 2), ["0001", "0002"])
+
+
+class DashboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.customer = customers.objects.create(name="Acme", notes="")
+        salesInvoice.objects.create(customer=self.customer, payments_terms="30 Days", journals=self.journal, total=Decimal("120.50"), Status="posted")
+
+    def test_dashboard_is_computed_in_few_queries_and_cached(self):
+        # customer and vendor aggregates, the product count and the four recent-document lists
+        with self.assertNumQueries(7):
+            data = self.client.get("/account/dashboard/").data
+        self.assertEqual(data["total_revenue"], Decimal("120.50"))
+        self.assertEqual(data["net_profit"], Decimal("120.50"))
+        self.assertEqual(data["total_customers"], 1)
+        self.assertEqual(data["recent_invoices"][0]["customer__name"], "Acme")
+
+        with self.assertNumQueries(0):
+            self.client.get("/account/dashboard/")
+
+    def test_totals_are_three_aggregates(self):
+        customers.objects.create(name="Globex", notes="")
+        salesInvoice.objects.create(customer=self.customer, payments_terms="30 Days", journals=self.journal, total=Decimal("9.50"), Status="posted")
+        supplier = vendor.objects.create(name="Initech", address="", status="active", notes="")
+        vendor.objects.create(name="Hooli", address="", status="active", notes="")
+        purchaseinvoice.objects.create(vendor=supplier, payments_terms="30 Days", journals=self.journal, total=Decimal("30.00"))
+        purchaseinvoice.objects.create(vendor=supplier, payments_terms="30 Days", journals=self.journal, total=Decimal("20.00"))
+
+        with self.assertNumQueries(3):
+            totals = dashboard_totals()
+        self.assertEqual((totals["total_customers"], totals["total_vendors"], totals["total_products"]), (2, 2, 0))
+        self.assertEqual((totals["total_revenue"], totals["total_expense"], totals["net_profit"]),
+                         (Decimal("130.00"), Decimal("50.00"), Decimal("80.00")))
+
+    def test_invoice_changes_invalidate_the_cache(self):
+        self.client.get("/account/dashboard/")
+        salesInvoice.objects.create(customer=self.customer, payments_terms="30 Days", journals=self.journal, total=Decimal("10.00"), Status="posted")
+        self.assertEqual(self.client.get("/account/dashboard/").data["total_revenue"], Decimal("130.50"))
+
+    def test_netprofit_and_products_are_routed(self):
+        self.assertEqual(self.client.get("/account/total_netprofit/").status_code, 200)
+        self.assertEqual(self.client.get("/account/total_products/").data, {"total_products": 0})
+
+
+class ReportRoutingTests(TestCase):
+
+    def test_reads_go_to_replica_only_inside_report_views(self):
+        router = ReportReplicaRouter()
+        replica = {"default": {}, "replica": {}}
+        with self.settings(DATABASES=replica):
+            self.assertEqual(router.db_for_read(Account), "default")
+            self.assertEqual(report_view(lambda: router.db_for_read(Account))(), "replica")
+            self.assertEqual(report_view(lambda: router.db_for_write(Account))(), "default")
+        self.assertEqual(report_view(lambda: router.db_for_read(Account))(), "default")
+
+
+class HotPathIndexTests(TestCase):
+    """EXPLAIN the hot queries after loading enough rows that a scan would be costly"""
+
+    @classmethod
+    def setUpTestData(cls):
+        journal = Journal.objects.create(journal_name="General", type="General")
+        accounts = Account.objects.bulk_create(
+            Account(code=f"7{i:04d}", name=f"A{i}", account_Type="asset", category="misc", description="") for i in range(50)
+        )
+        entries = JournalEntry.objects.bulk_create(
+            JournalEntry(journal=journal, reference=str(i), accounting_date=f"2025-01-{i % 28 + 1:02d}") for i in range(500)
+        )
+        JournalItems.objects.bulk_create(
+            JournalItems(account=accounts[i % 50], journalentry=entries[i % 500], debit=Decimal("1.00")) for i in range(2000)
+        )
+        customer_rows = customers.objects.bulk_create(
+            customers(name=f"Customer {i}", email=f"c{i}@example.com", notes="") for i in range(500)
+        )
+        salesInvoice.objects.bulk_create(
+            salesInvoice(customer=customer_rows[i], journals=journal, payments_terms="30 Days", invoice_Date=f"2025-02-{i % 28 + 1:02d}")
+            for i in range(500)
+        )
+        vendor.objects.bulk_create(vendor(name=f"Vendor {i}", email=f"v{i}@example.com", address="", status="active", notes="") for i in range(500))
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, plan)
+
+    def test_ledger_reads_by_account(self):
+        account = Account.objects.get(code="70007")
+        self.assertUsesIndex(
+            JournalItems.objects.filter(account=account).order_by("journalentry__accounting_date", "id"),
+            "journalitem_account_entry_idx",
+        )
+
+    def test_recent_invoices(self):
+        self.assertUsesIndex(salesInvoice.objects.order_by("-invoice_Date", "-id")[:5], "salesinvoice_date_idx")
+
+    def test_customer_and_vendor_lookups(self):
+        self.assertUsesIndex(customers.objects.filter(email="c42@example.com"), "customer_email_idx")
+        self.assertUsesIndex(customers.objects.filter(name="Customer 42"), "customer_name_idx")
+        self.assertUsesIndex(vendor.objects.filter(email="v42@example.com"), "vendor_email_idx")
+        self.assertUsesIndex(vendor.objects.filter(name="Vendor 42"), "vendor_name_idx")
+
+    def test_recent_payments(self):
+        self.assertUsesIndex(customer_payment.objects.order_by("-payment_date", "-id")[:5], "customerpayment_date_idx")
+        self.assertUsesIndex(vendor_payment.objects.order_by("-payment_date", "-id")[:5], "vendorpayment_date_idx")
+
+
+class PeriodCloseTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+        self.january = FiscalPeriod.objects.create(name="2025-01", start_date="2025-01-01", end_date="2025-01-31")
+        self.february = FiscalPeriod.objects.create(name="2025-02", start_date="2025-02-01", end_date="2025-02-28")
+
+    def post_entry(self, amount, date):
+        entry = JournalEntry.objects.create(journal=self.journal, accounting_date=date)
+        JournalItems.objects.create(account=self.cash, journalentry=entry, debit=amount)
+        JournalItems.objects.create(account=self.sales, journalentry=entry, credit=amount)
+        return entry
+
+    def test_close_snapshots_cumulative_totals(self):
+        self.post_entry(Decimal("100.00"), "2025-01-10")
+        self.post_entry(Decimal("30.00"), "2025-02-05")
+        close_period(self.january)
+        close_period(self.february)
+
+        snapshot = AccountPeriodBalance.objects.get(period=self.february, account=self.cash)
+        self.assertEqual((snapshot.debit, snapshot.credit), (Decimal("130.00"), Decimal("0.00")))
+
+    def test_reports_use_snapshot_plus_open_delta(self):
+        self.post_entry(Decimal("100.00"), "2025-01-10")
+        close_period(self.january)
+        self.post_entry(Decimal("5.00"), "2025-02-03")
+
+        self.assertEqual(balances_as_of("2025-02-28")[self.cash.id], [Decimal("105.00"), Decimal("0.00")])
+        self.assertEqual(trial_balance(date_to="2025-02-28")["total_debits"], Decimal("105.00"))
+        self.assertEqual(trial_balance(date_to="2025-01-31")["total_debits"], Decimal("100.00"))
+
+        data = self.client.get(f"/account/genaral_ledger/{self.cash.id}/", {"date_from": "2025-02-01"}).data
+        self.assertEqual(data["opening_balance"], Decimal("100.00"))
+        self.assertEqual(data["results"][0]["balance"], Decimal("105.00"))
+
+    def test_closed_period_rejects_postings(self):
+        entry = self.post_entry(Decimal("10.00"), "2025-01-10")
+        self.client.post(f"/account/period_close/{self.january.id}/")
+
+        with self.assertRaises(PeriodClosedError):
+            JournalEntry.objects.create(journal=self.journal, accounting_date="2025-01-15")
+        with self.assertRaises(PeriodClosedError):
+            JournalItems.objects.create(account=self.cash, journalentry=entry, debit=Decimal("1.00"))
+        with self.assertRaises(PeriodClosedError), transaction.atomic():
+            entry.items.first().delete()
+
+        response = self.client.post("/account/journalentry_bulk/", {"entries": [{
+            "journal": self.journal.id,
+            "accounting_date": "2025-01-20",
+            "items": [{"account": self.cash.id, "debit": "1.00"}, {"account": self.sales.id, "credit": "1.00"}],
+        }]}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+        self.post_entry(Decimal("10.00"), "2025-02-01")
+
+    def test_entry_cannot_move_out_of_a_closed_period(self):
+        entry = self.post_entry(Decimal("100.00"), "2025-01-10")
+        close_period(self.january)
+
+        entry.accounting_date = datetime.date(2025, 2, 10)
+        with self.assertRaises(PeriodClosedError):
+            entry.save()
+        self.assertEqual(JournalEntry.objects.get(pk=entry.pk).accounting_date, datetime.date(2025, 1, 10))
+        self.assertEqual(balances_as_of("2025-02-28")[self.cash.id], [Decimal("100.00"), Decimal("0.00")])
+
+    def test_periods_close_in_order(self):
+        response = self.client.post(f"/account/period_close/{self.february.id}/")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(FiscalPeriod.objects.get(pk=self.february.pk).is_closed)
+
+
+class AccountTreeTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.assets = Account.objects.create(name="Assets", account_Type="asset", category="group", description="")
+        self.current = Account.objects.create(name="Current", account_Type="asset", category="group", description="", parent=self.assets)
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="", parent=self.current)
+        self.bank = Account.objects.create(name="Bank", account_Type="asset", category="current", description="", parent=self.current)
+        self.fixed = Account.objects.create(name="Fixed", account_Type="asset", category="group", description="", parent=self.assets)
+        self.income = Account.objects.create(name="Income", account_Type="income", category="revenue", description="")
+
+    def post_entry(self, debit_account, amount, date="2025-01-10"):
+        entry = JournalEntry.objects.create(journal=self.journal, accounting_date=date)
+        JournalItems.objects.create(account=debit_account, journalentry=entry, debit=amount)
+        JournalItems.objects.create(account=self.income, journalentry=entry, credit=amount)
+
+    def test_paths_follow_parents(self):
+        self.assertEqual(self.cash.path, f"/{self.assets.id}/{self.current.id}/{self.cash.id}/")
+        self.assertEqual(self.cash.depth, 2)
+        self.assertEqual(set(self.current.subtree()), {self.current, self.cash, self.bank})
+
+    def test_move_rewrites_subtree(self):
+        self.current.parent = self.income
+        self.current.save()
+
+        self.cash.refresh_from_db()
+        self.assertEqual(self.cash.path, f"/{self.income.id}/{self.current.id}/{self.cash.id}/")
+        self.assertEqual(self.cash.depth, 2)
+        self.assertEqual(set(self.assets.subtree()), {self.assets, self.fixed})
+
+        self.current.parent = None
+        self.current.save()
+        self.bank.refresh_from_db()
+        self.assertEqual((self.bank.path, self.bank.depth), (f"/{self.current.id}/{self.bank.id}/", 1))
+
+    def test_cannot_move_under_own_descendant(self):
+        response = self.client.put(f"/account/account_update/{self.assets.id}/", {"parent": self.cash.id}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assets.refresh_from_db()
+        self.assertIsNone(self.assets.parent_id)
+
+    def test_rollup_sums_subtrees_in_one_query(self):
+        self.post_entry(self.cash, Decimal("40.00"))
+        self.post_entry(self.bank, Decimal("60.00"))
+        self.post_entry(self.fixed, Decimal("25.00"))
+        self.post_entry(self.bank, Decimal("5.00"), date="2025-03-01")
+
+        with self.assertNumQueries(1):
+            data = account_rollup(account=self.assets.id, date_to="2025-02-28")
+        self.assertEqual(data["account"]["total_debit"], Decimal("125.00"))
+        self.assertEqual({row["name"]: row["balance"] for row in data["children"]}, {"Current": Decimal("100.00"), "Fixed": Decimal("25.00")})
+
+        roots = self.client.get("/account/account_rollup/").data
+        self.assertIsNone(roots["account"])
+        self.assertEqual({row["name"]: row["balance"] for row in roots["children"]}, {"Assets": Decimal("130.00"), "Income": Decimal("-130.00")})
+
+    def test_rollup_view_rejects_bad_params(self):
+        self.assertEqual(self.client.get("/account/account_rollup/", {"account": "cash"}).status_code, 400)
+        self.assertEqual(self.client.get("/account/account_rollup/", {"date_from": "x"}).status_code, 400)
+        self.assertEqual(self.client.get("/account/account_rollup/", {"date_to": "2025-02-30"}).status_code, 400)
+
+
+class FinancialStatementTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.loan = Account.objects.create(name="Loan", account_Type="liability", category="long term", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+        self.rent = Account.objects.create(name="Rent", account_Type="expense", category="operating", description="")
+
+    def post_entry(self, debit_account, credit_account, amount, date):
+        entry = JournalEntry.objects.create(journal=self.journal, accounting_date=date)
+        JournalItems.objects.create(account=debit_account, journalentry=entry, debit=amount)
+        JournalItems.objects.create(account=credit_account, journalentry=entry, credit=amount)
+
+    def test_income_statement_compares_periods_in_one_query(self):
+        self.post_entry(self.cash, self.sales, Decimal("100.00"), "2025-02-10")
+        self.post_entry(self.cash, self.sales, Decimal("300.00"), "2025-03-05")
+        self.post_entry(self.rent, self.cash, Decimal("50.00"), "2025-03-20")
+        self.post_entry(self.cash, self.sales, Decimal("70.00"), "2024-03-15")
+
+        with self.assertNumQueries(1):
+            data = financial_statement("income_statement", "2025-03-01", "2025-03-31", compare=["previous_period", "previous_year"])
+
+        self.assertEqual([(p["label"], str(p["date_from"]), str(p["date_to"])) for p in data["periods"]], [
+            ("current", "2025-03-01", "2025-03-31"),
+            ("previous_period", "2025-01-29", "2025-02-28"),
+            ("previous_year", "2024-03-01", "2024-03-31"),
+        ])
+        income = data["sections"][0]
+        self.assertEqual(income["categories"], [{"category": "revenue", "amounts": [Decimal("300.00"), Decimal("100.00"), Decimal("70.00")]}])
+        self.assertEqual(data["net_income"], [Decimal("250.00"), Decimal("100.00"), Decimal("70.00")])
+
+    def test_balance_sheet_balances_with_current_earnings(self):
+        self.post_entry(self.cash, self.loan, Decimal("1000.00"), "2025-01-05")
+        self.post_entry(self.cash, self.sales, Decimal("200.00"), "2025-02-10")
+        self.post_entry(self.rent, self.cash, Decimal("80.00"), "2025-03-10")
+
+        data = self.client.get("/account/financial_statement/", {"statement": "balance_sheet", "date_to": "2025-02-28", "compare": "previous_year"}).data
+
+        self.assertEqual(data["total_assets"], [Decimal("1200.00"), Decimal("0.00")])
+        self.assertEqual(data["total_liabilities_and_equity"], data["total_assets"])
+        equity = data["sections"][2]
+        self.assertEqual(equity["categories"], [{"category": "current earnings", "amounts": [Decimal("200.00"), Decimal("0.00")]}])
+
+    def test_rejects_unknown_statement(self):
+        response = self.client.get("/account/financial_statement/", {"statement": "cash_flow"})
+        self.assertEqual(response.status_code, 400)
+
+
+class AgingTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.acme = customers.objects.create(name="Acme", notes="")
+        self.globex = customers.objects.create(name="Globex", notes="")
+        self.as_of = datetime.date(2025, 6, 30)
+
+    def invoice(self, customer, total, due, status="posted"):
+        return salesInvoice.objects.create(customer=customer, payments_terms="30 Days", journals=self.journal,
+                                           total=Decimal(total), Due_Date=due, Status=status)
+
+    def pay(self, invoice, amount, status="paid"):
+        customer_payment.objects.create(customer=invoice.customer, invoice=invoice, amount=Decimal(amount),
+                                        journal=self.journal, status=status)
+
+    def test_residuals_are_bucketed_per_customer_in_one_query(self):
+        self.pay(self.invoice(self.acme, "100.00", "2025-07-15"), "40.00")
+        self.invoice(self.acme, "50.00", "2025-05-31")          # 30 days
+        self.invoice(self.acme, "70.00", "2025-05-30")          # 31 days
+        self.invoice(self.acme, "20.00", "2025-03-01")          # 121 days
+        paid = self.invoice(self.globex, "80.00", "2025-04-15")
+        self.pay(paid, "30.00")
+        self.pay(paid, "50.00")
+        self.pay(self.invoice(self.globex, "90.00", "2025-04-15"), "90.00", status="draft")
+        self.invoice(self.globex, "500.00", "2025-01-01", status="draft")
+
+        with self.assertNumQueries(1):
+            data = ar_aging(self.as_of)
+
+        acme, globex = data["results"]
+        self.assertEqual((acme["customer"], acme["0_30"], acme["31_60"], acme["90_plus"], acme["total"]),
+                         ("Acme", Decimal("110.00"), Decimal("70.00"), Decimal("20.00"), Decimal("200.00")))
+        self.assertEqual(acme["invoices"], 4)
+        self.assertEqual((globex["61_90"], globex["total"]), (Decimal("90.00"), Decimal("90.00")))
+        self.assertEqual(data["totals"]["total"], Decimal("290.00"))
+
+    def test_view_defaults_as_of_and_validates(self):
+        self.invoice(self.acme, "10.00", None)
+        self.assertEqual(self.client.get("/account/ar_aging/").data["totals"]["0_30"], Decimal("10.00"))
+        self.assertEqual(self.client.get("/account/ar_aging/", {"as_of": "June"}).status_code, 400)
+        self.assertEqual(self.client.get("/account/ar_aging/", {"as_of": "2025-02-30"}).status_code, 400)
+
+
+class PayablesTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="Purchases", type="Purchases")
+        self.supplier = vendor.objects.create(name="Initech", address="", status="active", notes="", payment=45)
+        self.as_of = datetime.date(2025, 6, 30)
+
+    def bill(self, total, invoice_date, due=None, status="posted"):
+        return purchaseinvoice.objects.create(vendor=self.supplier, invoice_Date=invoice_date, Due_Date=due,
+                                              payments_terms="45 Days", journals=self.journal,
+                                              total=Decimal(total), Status=status)
+
+    def test_due_date_defaults_to_vendor_payment_days(self):
+        self.assertEqual(self.bill("10.00", "2025-06-01").Due_Date, datetime.date(2025, 7, 16))
+        self.assertEqual(self.bill("10.00", "2025-06-01", due="2025-06-10").Due_Date, "2025-06-10")
+
+    def test_aging_and_forecast_use_residuals(self):
+        partly_paid = self.bill("100.00", "2025-03-01")                  # due 2025-04-15, 76 days
+        vendor_payment.objects.create(vendors=self.supplier, invoice=partly_paid, amount=Decimal("30.00"), journal=self.journal, status="paid")
+        vendor_payment.objects.create(vendors=self.supplier, amount=Decimal("999.00"), journal=self.journal, status="paid")
+        self.bill("40.00", "2025-06-20", due="2025-07-02")               # week 1
+        self.bill("25.00", "2025-06-20", due="2025-07-09")               # week 2
+        self.bill("60.00", "2025-06-20", due="2025-09-30")               # later
+        self.bill("500.00", "2025-06-20", status="draft")
+
+        aging = ap_aging(self.as_of)
+        self.assertEqual(aging["results"][0]["vendor"], "Initech")
+        self.assertEqual((aging["totals"]["0_30"], aging["totals"]["61_90"], aging["totals"]["total"]),
+                         (Decimal("125.00"), Decimal("70.00"), Decimal("195.00")))
+
+        with self.assertNumQueries(1):
+            forecast = cash_forecast(weeks=2, as_of=self.as_of)
+        self.assertEqual(forecast["overdue"], Decimal("70.00"))
+        self.assertEqual([week["amount"] for week in forecast["weeks"]], [Decimal("40.00"), Decimal("25.00")])
+        self.assertEqual(forecast["weeks"][1]["week_start"], datetime.date(2025, 7, 7))
+        self.assertEqual((forecast["later"], forecast["total"]), (Decimal("60.00"), Decimal("195.00")))
+
+    def test_forecast_view_validates_weeks(self):
+        self.assertEqual(self.client.get("/account/cash_forecast/", {"weeks": "0"}).status_code, 400)
+        self.assertEqual(len(self.client.get("/account/cash_forecast/", {"weeks": "4"}).data["weeks"]), 4)
+
+    def test_views_reject_impossible_dates(self):
+        self.assertEqual(self.client.get("/account/ap_aging/", {"as_of": "2025-02-30"}).status_code, 400)
+        self.assertEqual(self.client.get("/account/cash_forecast/", {"as_of": "2025-02-30"}).status_code, 400)
+
+
+class InvoiceImportTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.receivable = Account.objects.create(code="1000", name="Receivable", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(code="4000", name="Sales", account_Type="income", category="revenue", description="")
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.acme = customers.objects.create(name="Acme", notes="")
+        self.widget = product.objects.create(Name="Widget", sales=True, purchase=False, product_type="GOODS", price=Decimal("2.50"), description="")
+
+    def write_csv(self, rows):
+        handle = tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="")
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow(IMPORT_COLUMNS)
+            writer.writerows(rows)
+        return handle.name
+
+    def test_import_posts_valid_invoices_and_reports_bad_rows(self):
+        c, j, w = self.acme.id, self.journal.id, self.widget.id
+        path = self.write_csv([
+            ["A1", c, "2025-05-01", "", "30 Days", j, w, "4", "", "uses product price"],
+            ["A1", c, "2025-05-01", "", "30 Days", j, w, "1", "3.00", ""],
+            ["B7", c, "2025-05-02", "2025-06-01", "30 Days", j, w, "2", "5.00", ""],
+            ["C3", 9999, "2025-05-03", "", "30 Days", j, w, "1", "", ""],
+            ["D4", c, "2025-05-04", "", "30 Days", j, w, "0", "", ""],
+            ["D4", c, "2025-05-04", "", "30 Days", j, w, "1", "", ""],
+        ])
+        job = InvoiceImport.objects.create(file_name="invoices.csv", path=path)
+
+        with mock.patch("account.imports.IMPORT_BATCH_SIZE", 1):
+            job = run_import(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total_rows, job.processed_rows), ("done", 6, 6))
+        self.assertEqual((job.created_invoices, job.failed_rows), (2, 3))
+        self.assertEqual([(e["row"], e["error"]) for e in job.errors], [
+            (5, "customer 9999 not found"),
+            (6, "quantity must be a positive number"),
+            (7, "invoice has invalid rows"),
+        ])
+        self.assertFalse(os.path.exists(path))
+
+        invoices = salesInvoice.objects.order_by("id")
+        self.assertEqual([(i.total, i.Status) for i in invoices], [(Decimal("13.00"), "posted"), (Decimal("10.00"), "posted")])
+        self.assertEqual(InvoiceLine.objects.count(), 3)
+        self.assertEqual(JournalEntry.objects.filter(status="posted").count(), 2)
+        self.receivable.refresh_from_db()
+        self.acme.refresh_from_db()
+        self.assertEqual((self.receivable.balance, self.acme.current_balance), (Decimal("23.00"), Decimal("23.00")))
+
+    def test_malformed_due_date_is_reported(self):
+        c, j, w = self.acme.id, self.journal.id, self.widget.id
+        path = self.write_csv([
+            ["E5", c, "2025-05-01", "2025-02-30", "30 Days", j, w, "1", "", ""],
+            ["F6", c, "2025-05-01", "June", "30 Days", j, w, "1", "", ""],
+        ])
+        job = run_import(InvoiceImport.objects.create(file_name="invoices.csv", path=path).id)
+
+        job.refresh_from_db()
+        self.assertEqual((job.created_invoices, job.failed_rows), (0, 2))
+        self.assertEqual([(e["row"], e["error"]) for e in job.errors],
+                         [(2, "Due_Date must be YYYY-MM-DD"), (3, "Due_Date must be YYYY-MM-DD")])
+        self.assertFalse(salesInvoice.objects.exists())
+
+    def test_upload_is_queued_for_the_worker(self):
+        upload = SimpleUploadedFile("invoices.csv", b"invoice,customer\nX1,\n")
+        with mock.patch("account.imports.import_executor") as executor, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/account/invoice_import/", {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 202)
+        job = InvoiceImport.objects.get(pk=response.data["id"])
+        executor.return_value.submit.assert_called_once_with(import_worker, job.id)
+
+        run_import(job.id)
+        status = self.client.get(f"/account/invoice_import_status/{job.id}/").data
+        self.assertEqual((status["status"], status["failed_rows"], status["progress"]), ("done", 1, 100.0))
+        errors = self.client.get(f"/account/invoice_import_errors/{job.id}/").data["errors"]
+        self.assertEqual(errors[0]["error"], "customer is required")
+
+    def test_rejects_unknown_file_type(self):
+        upload = SimpleUploadedFile("invoices.txt", b"")
+        self.assertEqual(self.client.post("/account/invoice_import/", {"file": upload}, format="multipart").status_code, 400)
+
+
+class ListPaginationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        for name in ["Delta", None, "alpha", "Charlie", None, "Bravo", "Delta"]:
+            customers.objects.create(name=name, email=f"{name}@example.com" if name else None, notes="")
+
+    def walk(self, url, params):
+        rows, cursor = [], None
+        while True:
+            data = self.client.get(url, dict(params, **({"cursor": cursor} if cursor else {}))).data
+            rows += data["results"]
+            cursor = data["next_cursor"]
+            if not data["has_more"]:
+                self.assertIsNone(cursor)
+                return rows
+
+    def test_keyset_pages_cover_every_row_once_with_nulls(self):
+        expected = list(customers.objects.order_by(F("name").asc(nulls_first=True), "id").values_list("id", flat=True))
+        rows = self.walk("/account/customers_list/", {"ordering": "name", "limit": 2})
+        self.assertEqual([row["id"] for row in rows], expected)
+
+        rows = self.walk("/account/customers_list/", {"ordering": "-name", "limit": 3})
+        self.assertEqual([row["id"] for row in rows], list(customers.objects.order_by(F("name").desc(nulls_last=True), "-id").values_list("id", flat=True)))
+
+    def test_fields_limit_the_columns_loaded(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get("/account/customers_list/", {"fields": "id,name", "limit": 3}).data
+        self.assertEqual(set(data["results"][0]), {"id", "name"})
+        self.assertNotIn('"notes"', ctx.captured_queries[0]["sql"])
+
+        self.assertEqual(self.client.get("/account/customers_list/", {"fields": "id,secret"}).status_code, 400)
+        self.assertEqual(self.client.get("/account/customers_list/", {"ordering": "notes"}).status_code, 400)
+
+    def test_null_ordering_only_on_nullable_columns(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get("/account/customers_list/", {"ordering": "-id", "limit": 2})
+            self.client.get("/account/customers_list/", {"ordering": "name", "limit": 2})
+        self.assertNotIn("NULLS", ctx.captured_queries[0]["sql"])
+        self.assertIn("NULLS FIRST", ctx.captured_queries[1]["sql"])
+
+    def test_cursor_is_tied_to_its_ordering(self):
+        cursor = self.client.get("/account/customers_list/", {"ordering": "name", "limit": 1}).data["next_cursor"]
+        response = self.client.get("/account/customers_list/", {"ordering": "email", "cursor": cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_nested_lines_are_prefetched_and_filters_apply(self):
+        journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        acme = customers.objects.first()
+        for day in range(1, 6):
+            invoice = salesInvoice.objects.create(customer=acme, payments_terms="30 Days", journals=journal, invoice_Date=f"2025-01-0{day}")
+            InvoiceLine.objects.bulk_create([InvoiceLine(invoices=invoice, quantity=1, price=day) for _ in range(2)])
+
+        with self.assertNumQueries(2):
+            data = self.client.get("/account/invoice_list/", {"ordering": "-invoice_Date", "date_from": "2025-01-02", "limit": 10}).data
+        self.assertEqual([row["invoice_Date"] for row in data["results"]], ["2025-01-05", "2025-01-04", "2025-01-03", "2025-01-02"])
+        self.assertEqual(len(data["results"][0]["lines"]), 2)
+
+    def test_row_endpoints_return_plain_columns(self):
+        journal = Journal.objects.create(journal_name="General", type="General")
+        cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        entry = JournalEntry.objects.create(journal=journal)
+        JournalItems.objects.create(account=cash, journalentry=entry, credit=Decimal("7.00"))
+        supplier = vendor.objects.create(name="Initech", address="", status="active", notes="")
+        vendor_payment.objects.create(vendors=supplier, amount=Decimal("3.00"), journal=journal, status="draft")
+
+        item = self.client.get("/account/JournalItems_list/", {"account": cash.id}).data["results"][0]
+        self.assertEqual((item["account"], item["debit"], item["credit"]), (cash.id, None, Decimal("7.00")))
+        payment = self.client.get("/account/vendor_payment_details/", {"fields": "vendors,amount"}).data["results"][0]
+        self.assertEqual(payment, {"vendors": supplier.id, "amount": Decimal("3.00")})
+
+
+class JournalEntryReadTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+        for amount in ("10.00", "20.00", "30.00"):
+            entry = JournalEntry.objects.create(journal=self.journal)
+            JournalItems.objects.create(account=self.cash, journalentry=entry, debit=Decimal(amount))
+            JournalItems.objects.create(account=self.sales, journalentry=entry, credit=Decimal(amount))
+
+    def test_entries_items_and_totals_in_two_queries(self):
+        with self.assertNumQueries(2):
+            data = self.client.get("/account/journalentry_list/").data
+        first = data["results"][0]
+        self.assertEqual((first["journal_name"], first["total_debit"], first["total_credit"]), ("General", "10.00", "10.00"))
+        self.assertEqual([(item["account_name"], item["debit"], item["credit"]) for item in first["items"]],
+                         [("Cash", "10.00", None), ("Sales", None, "10.00")])
+
+    def test_sparse_fields_keep_annotations_and_joins_valid(self):
+        data = self.client.get("/account/journalentry_list/", {"fields": "id,reference,total_credit", "ordering": "-id"}).data
+        self.assertEqual([row["total_credit"] for row in data["results"]], ["30.00", "20.00", "10.00"])
+
+        with self.assertNumQueries(1):
+            rows = self.client.get("/account/journal_entry_details/", {"fields": "id,total_debit"}).data["results"]
+        self.assertEqual([row["total_debit"] for row in rows], [Decimal("10.00"), Decimal("20.00"), Decimal("30.00")])
+
+
+class JournalEntryCreateTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.journal = Journal.objects.create(journal_name="General", type="General")
+        self.cash = Account.objects.create(name="Cash", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(name="Sales", account_Type="income", category="revenue", description="")
+
+    def payload(self, debit, credit, account=None):
+        return {"journal": self.journal.id, "accounting_date": "2025-04-01", "items": [
+            {"account": account or self.cash.id, "debit": debit},
+            {"account": self.sales.id, "credit": credit},
+        ]}
+
+    def test_unbalanced_entry_is_rejected_before_any_write(self):
+        # only the journal primary key is looked up
+        with self.assertNumQueries(1):
+            response = self.client.post("/account/journalentry_create/", self.payload("10.00", "9.99"), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JournalEntry.objects.exists())
+
+    def test_balanced_entry_is_written_once(self):
+        response = self.client.post("/account/journalentry_create/", self.payload("10.10", "10.10"), format="json")
+        self.assertEqual(response.status_code, 201)
+        entry = JournalEntry.objects.get(pk=response.data["id"])
+        self.assertEqual(entry.items.count(), 2)
+        self.assertTrue(entry.is_balanced())
+        self.cash.refresh_from_db()
+        self.sales.refresh_from_db()
+        self.assertEqual((self.cash.balance, self.sales.balance), (Decimal("10.10"), Decimal("-10.10")))
+
+    def test_missing_account_is_rejected(self):
+        response = self.client.post("/account/journalentry_create/", self.payload("5.00", "5.00", account=9999), format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(JournalItems.objects.exists())
+
+    def test_tolerance_follows_the_books_currency(self):
+        with self.settings(ACCOUNT_CURRENCY="XYZ", JOURNAL_BALANCE_TOLERANCE={"XYZ": "0.01"}):
+            response = self.client.post("/account/journalentry_create/", self.payload("10.00", "9.99"), format="json")
+        self.assertEqual(response.status_code, 201)
+
+
+class PostingConcurrencyTests(TestCase):
+
+    def setUp(self):
+        Account.objects.create(code="1000", name="Receivable", account_Type="asset", category="current", description="")
+        Account.objects.create(code="4000", name="Sales", account_Type="income", category="revenue", description="")
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.customer = customers.objects.create(name="Acme", notes="")
+
+    def test_stale_copy_cannot_post_twice(self):
+        invoice = salesInvoice.objects.create(customer=self.customer, payments_terms="30 Days", journals=self.journal, total=Decimal("40.00"))
+        stale = salesInvoice.objects.get(pk=invoice.pk)
+
+        invoice.post()
+        with self.assertRaises(StaleDocumentError):
+            stale.post()
+
+        self.assertEqual((invoice.Status, invoice.version), ("posted", 1))
+        self.customer.refresh_from_db()
+        self.assertEqual(self.customer.current_balance, Decimal("40.00"))
+        self.assertEqual(JournalEntry.objects.count(), 1)
+
+    def test_failed_post_leaves_no_draft_invoice(self):
+        Account.objects.filter(code="4000").delete()
+        serializer = InvoiceSerializer(data={
+            "customer": self.customer.id,
+            "payments_terms": "30 Days",
+            "journals": self.journal.id,
+            "lines": [{"quantity": "1.00", "price": "5.00"}],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaises(Account.DoesNotExist):
+            serializer.save()
+        self.assertFalse(salesInvoice.objects.exists())
+        self.assertFalse(InvoiceLine.objects.exists())
+
+
+class PostingStressTests(TransactionTestCase):
+
+    POSTERS = 8
+
+    def setUp(self):
+        self.receivable = Account.objects.create(code="1000", name="Receivable", account_Type="asset", category="current", description="")
+        Account.objects.create(code="4000", name="Sales", account_Type="income", category="revenue", description="")
+        Account.objects.create(code="1200", name="Bank", account_Type="asset", category="current", description="")
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.customers = [customers.objects.create(name=f"Customer {i}", notes="") for i in range(3)]
+
+    def post_in_thread(self, model, pk):
+        try:
+            # post() returns None when the copy it loaded was already posted
+            return model.objects.get(pk=pk).post() is not None
+        except StaleDocumentError:
+            return False
+        finally:
+            connection.close()
+
+    def test_parallel_posters_keep_balances_reconciled(self):
+        invoices = [
+            salesInvoice.objects.create(customer=self.customers[i % 3], payments_terms="30 Days", journals=self.journal,
+                                        total=Decimal(10 + i))
+            for i in range(30)
+        ]
+        payments = [
+            customer_payment.objects.create(customer=invoice.customer, invoice=invoice, amount=Decimal("5.00"),
+                                            journal=self.journal, status="draft")
+            for invoice in invoices[:15]
+        ]
+        # every document is raced by two posters
+        jobs = [(salesInvoice, invoice.pk) for invoice in invoices] * 2 + [(customer_payment, payment.pk) for payment in payments] * 2
+
+        with ThreadPoolExecutor(max_workers=self.POSTERS) as pool:
+            results = list(pool.map(lambda job: self.post_in_thread(*job), jobs))
+
+        self.assertEqual(results.count(True), len(invoices) + len(payments))
+        self.assertEqual(JournalEntry.objects.count(), len(invoices) + len(payments))
+        self.assertFalse(salesInvoice.objects.exclude(Status="posted", version=1).exists())
+
+        for customer in self.customers:
+            customer.refresh_from_db()
+            billed = sum((i.total for i in invoices if i.customer_id == customer.id), Decimal("0.00"))
+            paid = sum((p.amount for p in payments if p.customer_id == customer.id), Decimal("0.00"))
+            self.assertEqual(customer.current_balance, billed - paid)
+
+        self.receivable.refresh_from_db()
+        outstanding = sum(c.current_balance for c in self.customers)
+        self.assertEqual(self.receivable.balance, outstanding)
+
+
+class ReconciliationTests(TestCase):
+
+    def setUp(self):
+        self.receivable = Account.objects.create(code="1000", name="Receivable", account_Type="asset", category="current", description="")
+        self.sales = Account.objects.create(code="4000", name="Sales", account_Type="income", category="revenue", description="")
+        Account.objects.create(code="1200", name="Bank", account_Type="asset", category="current", description="")
+        self.journal = Journal.objects.create(journal_name="Sales", type="Sales")
+        self.customers = [customers.objects.create(name=f"Customer {i}", notes="") for i in range(3)]
+        for i, customer in enumerate(self.customers):
+            invoice = salesInvoice.objects.create(customer=customer, payments_terms="30 Days", journals=self.journal, total=Decimal(10 * (i + 1)))
+            invoice.post()
+        customer_payment.objects.create(customer=self.customers[0], invoice=invoice, amount=Decimal("4.00"),
+                                        journal=self.journal, status="draft").post()
+        self.supplier = vendor.objects.create(name="Initech", address="", status="active", notes="")
+        purchaseinvoice.objects.create(vendor=self.supplier, payments_terms="30 Days", journals=self.journal,
+                                       total=Decimal("25.00"), Status="posted")
+        vendor_payment.objects.create(vendors=self.supplier, amount=Decimal("5.00"), journal=self.journal, status="paid")
+        vendor.objects.filter(pk=self.supplier.pk).update(current_balance=Decimal("20.00"))
+
+    def drift(self):
+        Account.objects.filter(pk=self.sales.pk).update(balance=Decimal("0.00"))
+        customers.objects.filter(pk=self.customers[1].pk).update(current_balance=None)
+        customers.objects.filter(pk=self.customers[2].pk).update(current_balance=Decimal("99.00"))
+        vendor.objects.filter(pk=self.supplier.pk).update(current_balance=Decimal("0.00"))
+
+    def test_posted_balances_reconcile(self):
+        for target in ("accounts", "customers", "vendors"):
+            self.assertEqual(list(reconcile(target)), [])
+
+    def test_reports_and_fixes_drift_chunk_by_chunk(self):
+        self.drift()
+        self.assertEqual(
+            [(row["label"], row["stored"], row["expected"]) for row in reconcile("customers", chunk_size=1)],
+            [("Customer 1", None, Decimal("20.00")), ("Customer 2", Decimal("99.00"), Decimal("30.00"))],
+        )
+
+        with self.assertRaises(CommandError):
+            call_command("reconcile_balances", stdout=StringIO())
+        call_command("reconcile_balances", "--fix", "--chunk-size", "1", stdout=StringIO())
+
+        self.assertEqual(
+            list(customers.objects.order_by("id").values_list("current_balance", flat=True)),
+            [Decimal("6.00"), Decimal("20.00"), Decimal("30.00")],
+        )
+        self.sales.refresh_from_db()
+        self.supplier.refresh_from_db()
+        self.assertEqual((self.sales.balance, self.supplier.current_balance), (Decimal("-60.00"), Decimal("20.00")))
+        call_command("reconcile_balances", stdout=StringIO())
+
+    def test_chunk_queries_do_not_grow_with_rows(self):
+        # target chunk, invoice totals, payment totals
+        with self.assertNumQueries(3):
+            self.assertEqual(list(reconcile("customers", chunk_size=10)), [])
+
+    def test_endpoints(self):
+        self.drift()
+        client = APIClient()
+
+        report = client.get("/account/reconcile_balances/", {"target": "customers,vendors"}).data
+        self.assertEqual((report["fixed"], list(report["targets"])), (False, ["customers", "vendors"]))
+        self.assertEqual(report["targets"]["customers"]["count"], 2)
+        self.assertEqual(report["targets"]["vendors"]["rows"][0]["difference"], Decimal("20.00"))
+        self.assertEqual(client.get("/account/reconcile_balances/", {"target": "ledger"}).status_code, 400)
+
+        fixed = client.post("/account/reconcile_balances_fix/").data
+        self.assertEqual({name: result["count"] for name, result in fixed["targets"].items()},
+                         {"accounts": 1, "customers": 2, "vendors": 1})
+        self.assertTrue(all(result["count"] == 0 for result in client.get("/account/reconcile_balances/").data["targets"].values()))
@@ -18,6 +18,7 @@ urlpatterns = [
 
 
     path("journalentry_create/",views.journalentry_create,name="journalentry_create"),
+    path("journalentry_bulk/",views.journalentry_bulk,name="journalentry_bulk"),
     path("journal_entry_details/",views.journal_entry_details,name="journal_details"),
     path("journalentry_list/",views.journalentry_details,name="journalentry_details"),
     path("journal_entry_delete/<int:id>/",views.journal_entry_delete,name="journal_entry_delete"),
@@ -26,11 +27,23 @@ urlpatterns = [
     path("journal_items_deleted/<int:id>/",views.journal_items),
     path("journal_items_details/",views.journal_items_details),
     path("JournalItems_list/",views.JournalItems_detail),
+    path("journal_items_export/",views.journal_items_export,name="journal_items_export"),
 
 
     path("trial_balance_view/",views.trial_balance_view,name="trial_balance"),
+    path("financial_statement/",views.financial_statement_view,name="financial_statement"),
+    path("ar_aging/",views.ar_aging_view,name="ar_aging"),
+    path("ap_aging/",views.ap_aging_view,name="ap_aging"),
+    path("cash_forecast/",views.cash_forecast_view,name="cash_forecast"),
+    path("account_rollup/",views.account_rollup_view,name="account_rollup"),
+    path("reconcile_balances/",views.reconcile_balances,name="reconcile_balances"),
+    path("reconcile_balances_fix/",views.reconcile_balances_fix,name="reconcile_balances_fix"),
     path("genaral_ledger/<int:id>/",views.genaral_ledger,name="genaral_ledger"),
 
+    path("period_create/",views.period_create,name="period_create"),
+    path("period_list/",views.period_list,name="period_list"),
+    path("period_close/<int:id>/",views.period_close,name="period_close"),
+
 
 
 
@@ -55,10 +68,14 @@ urlpatterns = [
     path("product_delete/<str:name>/",views.product_delete,name="product_delete"),
 
     path("invoice_create/",views.invoice_create,name="invoice_create"),
+    path("invoice_import/",views.invoice_import,name="invoice_import"),
+    path("invoice_import_status/<int:id>/",views.invoice_import_status,name="invoice_import_status"),
+    path("invoice_import_errors/<int:id>/",views.invoice_import_errors,name="invoice_import_errors"),
     path("invoice_list/",views.invoice_list,name="invoice_list"),
     path("customer_invoice_details/",views.invoice_details,name="invoice_details"),
     path("invoice_update/<int:id>/",views.invoice_update,name="invoice_update"),
     path("invoice_delete/<int:id>/",views.invoice_delete,name="invoice_delete"),
+    path("invoice_export/",views.invoice_export,name="invoice_export"),
     path("payment_create/",views.payment_create,name="payment_create"),
     path("payment_update/<int:id>/",views.payment_update,name="payment_update"),
     path("payment_delete/<int:id>/",views.payment_delete,name="payment_delete"),
@@ -69,6 +86,7 @@ urlpatterns = [
     path("vendor_details/",views.vendor_details,name="vendor_details"),
     path("vendor_update/<str:email>/",views.vendor_update,name="vendor_update"),
     path("vendor_delete/<str:name>/",views.vendor_delete,name="vendor_delete"),
+    path("vendor_export/",views.vendor_export,name="vendor_export"),
 
     path("vendor_product_create/",views.vendor_product_create,name="vendor_product_create"),
     path("product_view_vendor/",views.vendor_product_view,name="product_view"),
@@ -78,6 +96,7 @@ urlpatterns = [
     path("vendor_invoice_create/",views.vendor_invoice_create,name="vendor_invoice_create"),
     path("vendor_invoice_display/",views.vendor_invoice_display,name="vendor_invoice_display"),
     path("vendorinvoice_delete/",views.vendorinvoice_delete,name="vendorinvoice_delete"),
+    path("vendor_invoice_export/",views.vendor_invoice_export,name="vendor_invoice_export"),
 
     
     path("vendor_payment_create/",views.vendor_payment_create,name="vendor_payment_create"),
@@ -92,6 +111,9 @@ urlpatterns = [
     path("recent_payments/",views.recent_payments,name="recent_payments"),
     path("recent_vendor_invoices/",views.recent_vendor_invoices,name="recent_vendor_invoices"),
     path("recent_vendor_payments/",views.recent_vendor_payments,name="recent_vendor_payments"),
+    path("total_netprofit/",views.total_netprofit,name="total_netprofit"),
+    path("total_products/",views.total_Products,name="total_products"),
+    path("dashboard/",views.dashboard,name="dashboard"),
 
 
 
@@ -1,11 +1,23 @@
 from django.shortcuts import render
-from django.db.models import Sum
+from django.db.models import Case,CharField,Count,Sum,Q,F,Func,OuterRef,Prefetch,Subquery,Value,When
+from django.db.models.functions import Coalesce
+import datetime
+import os
+import tempfile
 from decimal import Decimal
 from rest_framework.response import Response
-from django.http import HttpResponse
+from django.http import JsonResponse,StreamingHttpResponse
+from django.core import signing
+from django.core.cache import cache
+from django.conf import settings
+from api.db_router import report_view
 from rest_framework.decorators import api_view
 from .models import customers,vendor,Account,Journal,JournalEntry,JournalItems,customer_contact,product,salesInvoice,InvoiceLine,vendor_product,customer_payment,vendor_payment,purchaseinvoice
-from .serializers import journalentrySerializer,JournalItemsSerializer,JournalSerializer,AccountSerializer,customersSerializer,customer_contactSerializer,productSerializer,InvoiceSerializer,InvoiceLineSerializer,vendor_productSerializer,purchaseinvoiceSerializer,vendor_paymentSerializer,customer_paymentsSerializer
+from .models import with_entry_totals,InvoiceImport,InvoiceStatus,paymentstatus,purchaseInvoiceStatus,vendorpaymentstatus,subtree_range,post_entries_bulk,DASHBOARD_CACHE_KEY,FiscalPeriod,PeriodClosedError,as_date,close_period,latest_closed_period
+from .imports import start_import
+from .listing import list_page
+from .reconcile import RECONCILE_TARGETS,reconcile
+from .serializers import bulkJournalEntrySerializer,journalentryDetailSerializer,journalentrySerializer,JournalItemsSerializer,JournalSerializer,AccountSerializer,customersSerializer,customer_contactSerializer,productSerializer,InvoiceSerializer,InvoiceLineSerializer,vendor_productSerializer,purchaseinvoiceSerializer,vendor_paymentSerializer,customer_paymentsSerializer
 
 # Create your views here.
 
@@ -47,9 +59,10 @@ def account_create(request):
 
 @api_view(['GET'])
 def account_list(request):
-    list =Account.objects.all()
-    serializer = AccountSerializer(list,many=True)
-    return Response(serializer.data)
+    return list_page(request, Account.objects.all(), 'account_list',
+                     serializer_class=AccountSerializer,
+                     orderable=('id','code','path'),
+                     filters={'parent':'parent_id','code':'code'})
 
 @api_view(['GET'])
 def account_details(request):
@@ -95,11 +108,14 @@ def account_update(request,id):
     parent_id = request.data.get('parent')
     if parent_id is not None:
         parent_instance =Account.objects.filter(id=parent_id).first()
-    if not parent_instance:
-        return Response({"msg":"parent account is not found"},status=400)
-    account_instance.parent = parent_instance    
+        if not parent_instance:
+            return Response({"msg":"parent account is not found"},status=400)
+        account_instance.parent = parent_instance    
 
-    account_instance.save()
+    try:
+        account_instance.save()
+    except ValueError as e:
+        return Response({"msg":str(e)},status=400)
 
     return Response({"msg":"account updated successfully"},status=200)
 
@@ -141,9 +157,10 @@ def journal_create(request):
 
 @api_view(['GET'])
 def journal_list(request):
-    list =Journal.objects.all()
-    serializer = JournalSerializer(list,many=True)
-    return Response(serializer.data)
+    return list_page(request, Journal.objects.all(), 'journal_list',
+                     serializer_class=JournalSerializer,
+                     orderable=('id','code'),
+                     filters={'code':'code'})
 
 
 ##journal_details ##
@@ -205,31 +222,78 @@ def journal_delete(request,id):
 import csv
 
 ##csv##
-def journal_export(request):
-    response = HttpResponse(content_type='text/csv')
+EXPORT_CHUNK_SIZE = 2000
 
-    writer = csv.writer(response)
-    writer.writerow(['code','journal_name','type','description'])
 
+class Echo:
+    """csv.writer target that hands each formatted row back instead of buffering it"""
+    def write(self, value):
+        return value
 
-    for j in Journal.objects.all():
-        writer.writerow([
-            j.code,j.journal_name,j.type,j.description
-        ])
 
-   
+def stream_csv(filename, header, rows):
+    writer = csv.writer(Echo())
 
-    response['content-Disposition'] = 'attachment; filename="journal.csv"'   
+    def generate():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
 
+    response = StreamingHttpResponse(generate(), content_type='text/csv')
+    response['content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
+
+def export_rows(queryset, fields):
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def journal_export(request):
+    fields = ['code','journal_name','type','description']
+
+    journals = Journal.objects.order_by('id')
+    if request.GET.get('type'):
+        journals = journals.filter(type=request.GET['type'])
+
+    return stream_csv("journal.csv", fields, export_rows(journals, fields))
+
+
+def journal_items_export(request):
+    fields = ['journalentry__reference','journalentry__accounting_date','journalentry__journal__code',
+              'account__code','account__name','partner','label','debit','credit']
+
+    # validated before the stream starts, so a bad value is a 400 rather than a broken download
+    try:
+        account = query_id(request, 'account')
+        journal = query_id(request, 'journal')
+        date_from = query_date(request, 'date_from')
+        date_to = query_date(request, 'date_to')
+    except QueryParamError as e:
+        return JsonResponse({"msg":str(e)},status=400)
+
+    items = JournalItems.objects.order_by('id')
+    if account:
+        items = items.filter(account_id=account)
+    if journal:
+        items = items.filter(journalentry__journal_id=journal)
+    if date_from:
+        items = items.filter(journalentry__accounting_date__gte=date_from)
+    if date_to:
+        items = items.filter(journalentry__accounting_date__lte=date_to)
+
+    header = ['reference','accounting_date','journal','account_code','account_name','partner','label','debit','credit']
+    return stream_csv("journal_items.csv", header, export_rows(items, fields))
+
 ##journalentry##
 
 @api_view(['POST'])
 def journalentry_create(request):
     serializer = journalentrySerializer(data=request.data)
     if serializer.is_valid():
-        journal_entry =serializer.save()
+        try:
+            journal_entry =serializer.save()
+        except PeriodClosedError as e:
+            return Response({"msg":str(e)},status=400)
         return Response({
             "msg":"journal entry created successfully",
             "id":journal_entry.id
@@ -237,35 +301,79 @@ def journalentry_create(request):
     else:
         return Response(serializer.errors,status=400)
 
+@api_view(['POST'])
+def journalentry_bulk(request):
+    payload = request.data.get('entries') if hasattr(request.data,'get') else request.data
+    if not payload:
+        return Response({"msg":"entries is not found"},status=400)
+
+    serializer = bulkJournalEntrySerializer(data=payload,many=True)
+    if not serializer.is_valid():
+        return Response(serializer.errors,status=400)
+
+    entries = serializer.validated_data
+    journal_ids = {entry['journal'] for entry in entries}
+    account_ids = {item['account'] for entry in entries for item in entry['items']}
+
+    missing_journals = journal_ids - set(Journal.objects.filter(id__in=journal_ids).values_list('id',flat=True))
+    missing_accounts = account_ids - set(Account.objects.filter(id__in=account_ids).values_list('id',flat=True))
+    if missing_journals or missing_accounts:
+        return Response({"msg":"journal or account id is not found",
+                         "journals":sorted(missing_journals),
+                         "accounts":sorted(missing_accounts)},status=400)
+
+    try:
+        created = post_entries_bulk([
+            {
+                "journal_id":entry['journal'],
+                "accounting_date":entry.get('accounting_date'),
+                "description":entry.get('description'),
+                "reference":entry.get('reference'),
+                "items":[
+                    {
+                        "account_id":item['account'],
+                        "partner":item.get('partner'),
+                        "label":item.get('label'),
+                        "debit":item['debit'],
+                        "credit":item['credit'],
+                    }
+                    for item in entry['items']
+                ],
+            }
+            for entry in entries
+        ])
+    except PeriodClosedError as e:
+        return Response({"msg":str(e)},status=400)
+
+    return Response({
+        "msg":"journal entries posted successfully",
+        "count":len(created),
+        "ids":[je.id for je in created]
+    },status=201)
+
+
 @api_view(['GET'])
 def journalentry_details(request):
-    journals = JournalEntry.objects.all()
-    serializer =journalentrySerializer(journals,many=True)
-    return Response(serializer.data)
+    entries = with_entry_totals(JournalEntry.objects.select_related('journal'))
+    return list_page(request, entries, 'journalentry_details',
+                     serializer_class=journalentryDetailSerializer,
+                     orderable=('id','accounting_date'),
+                     filters={'journal':'journal_id',
+                              'date_from':'accounting_date__gte',
+                              'date_to':'accounting_date__lte'},
+                     prefetch={'items':Prefetch('items', queryset=JournalItems.objects.select_related('account').order_by('id'))})
 
 
 @api_view(['GET'])
 def journal_entry_details(request):
-    try:
-        journalentry_details= JournalEntry.objects.all()
-
-        if not journalentry_details:
-            return Response({"journalentry_details is not found"},status=400)
-        
-        entry_details=[]
-        for edata in journalentry_details:
-            entry_details.append({
-                "id":edata.id,
-                "reference":edata.reference,
-                "accounting_date":edata.accounting_date,
-                "journal":edata.journal.id,
-                "description":edata.description,
-                "status":edata.status
-
-            })
-        return Response(entry_details,status=200)
-    except Exception as e:
-        return Response({"msg":"journalentry is created {str:{e}}"},status=400)
+    return list_page(request, with_entry_totals(JournalEntry.objects.all()), 'journal_entry_details',
+                     fields={'id':'id','reference':'reference','accounting_date':'accounting_date','journal':'journal',
+                             'description':'description','status':'status',
+                             'total_debit':'total_debit','total_credit':'total_credit'},
+                     orderable=('id','accounting_date'),
+                     filters={'journal':'journal_id',
+                              'date_from':'accounting_date__gte',
+                              'date_to':'accounting_date__lte'})
         
 
 @api_view(['DELETE'])
@@ -286,28 +394,9 @@ def journal_items_details(request):
 
 @api_view(['GET'])
 def JournalItems_detail(request):
-    try:
-        details = JournalItems.objects.all()
-
-        if not details:
-            return Response ({"msg":"JournalItems details is not found"},status=200)
-        
-
-        Items=[]
-        for data in details:
-            Items.append({
-                "id":data.id,
-                "account":data.account.id,
-                "partner":data.partner,
-                "label":data.label,
-                "debit":data.debit,
-                "credit":data.debit
-            
-            })
-        return Response(Items,status=200)
-        
-    except Exception as e:
-        return Response({"msg":"journal details is {str:{e}}"},status=400)    
+    return list_page(request, JournalItems.objects.all(), 'JournalItems_detail',
+                     fields={'id':'id','account':'account','partner':'partner','label':'label','debit':'debit','credit':'credit'},
+                     filters={'account':'account_id','journalentry':'journalentry_id'})
 
 
 @api_view(['DELETE'])
@@ -322,28 +411,62 @@ def  journal_items(request,id):
 
 ##trila balance##
 
-def trial_balance():
-    account =Account.objects.all()
-    
+def trial_balance(date_from=None, date_to=None, journal=None):
+    """Debit/credit totals for every account, computed in one grouped query"""
+    item_filter = Q()
+    if date_from:
+        item_filter &= Q(journalitems__journalentry__accounting_date__gte=date_from)
+    if date_to:
+        item_filter &= Q(journalitems__journalentry__accounting_date__lte=date_to)
+    if journal:
+        item_filter &= Q(journalitems__journalentry__journal_id=journal)
+
+    # a plain "as of" report starts from the latest closed-period snapshot
+    opening = {}
+    snapshot = latest_closed_period(date_to) if not date_from and not journal else None
+    if snapshot:
+        item_filter &= Q(journalitems__journalentry__accounting_date__gt=snapshot.end_date)
+        opening = {row[0]: row[1:] for row in snapshot.balances.values_list('account_id','debit','credit')}
+
+    account = (Account.objects
+               .annotate(total_debit=Sum('journalitems__debit', filter=item_filter),
+                         total_credit=Sum('journalitems__credit', filter=item_filter))
+               .values('id', 'code', 'name', 'parent_id', 'total_debit', 'total_credit')
+               .order_by('id'))
+
     trial_balance =[]
+    nodes = {}
     total_debits =Decimal("0.00")
     total_credits =Decimal("0.00")
 
     for acc in account:
-        debit =JournalItems.objects.filter(account=acc).aggregate(total=Sum('debit'))['total'] or (Decimal('0.00'))
-        credit =JournalItems.objects.filter(account=acc).aggregate(total =Sum('credit'))['total'] or (Decimal('0.00'))
+        opening_debit, opening_credit = opening.get(acc['id'], (Decimal('0.00'), Decimal('0.00')))
+        debit = (acc['total_debit'] or Decimal('0.00')) + opening_debit
+        credit = (acc['total_credit'] or Decimal('0.00')) + opening_credit
 
         balance = debit - credit
 
         if balance > 0:
-            trial_balance.append({"account":acc.name, 'debit':balance, "credit":Decimal("0.00")})
+            row = {"account":acc['name'], 'debit':balance, "credit":Decimal("0.00")}
             total_debits += balance
         else:
-            trial_balance.append({'account':acc.name,"debit":Decimal('0.00'),'credit':abs(balance)})
+            row = {'account':acc['name'],"debit":Decimal('0.00'),'credit':abs(balance)}
             total_credits -= balance
+        trial_balance.append(row)
+
+        nodes[acc['id']] = dict(row, id=acc['id'], code=acc['code'], parent=acc['parent_id'], children=[])
+
+    tree = []
+    for node in nodes.values():
+        parent = nodes.get(node['parent'])
+        if parent is not None:
+            parent['children'].append(node)
+        else:
+            tree.append(node)
 
     return {
         "rows":trial_balance,
+        "tree":tree,
         "total_debits":total_debits,
         "total_creditd":total_credits
         }
@@ -351,19 +474,475 @@ def trial_balance():
 
 
 @api_view(['GET'])
+@report_view
 def trial_balance_view(request):
-    DATA =trial_balance()
+    try:
+        DATA =trial_balance(
+            date_from=query_date(request, 'date_from'),
+            date_to=query_date(request, 'date_to'),
+            journal=query_id(request, 'journal'),
+        )
+    except QueryParamError as e:
+        return Response({"msg":str(e)},status=400)
+    return Response(DATA)
+
+STATEMENT_TYPES = {
+    "balance_sheet": ("asset", "liability", "equity"),
+    "income_statement": ("income", "expense"),
+}
+DEBIT_NORMAL_TYPES = ("asset", "expense")
+
+
+def shift_year(date, years=-1):
+    try:
+        return date.replace(year=date.year + years)
+    except ValueError:
+        return date.replace(year=date.year + years, day=28)
+
+
+def statement_periods(date_from=None, date_to=None, compare=()):
+    """(label, date_from, date_to) for the requested period followed by each comparison"""
+    if (date_from and not as_date(date_from)) or (date_to and not as_date(date_to)):
+        raise ValueError("dates must be YYYY-MM-DD")
+    date_to = as_date(date_to) if date_to else datetime.date.today()
+    date_from = as_date(date_from) if date_from else None
+
+    periods = [("current", date_from, date_to)]
+    for label in compare:
+        if label == "previous_period":
+            if not date_from:
+                raise ValueError("previous_period needs date_from")
+            prev_to = date_from - datetime.timedelta(days=1)
+            periods.append((label, prev_to - (date_to - date_from), prev_to))
+        elif label == "previous_year":
+            periods.append((label, shift_year(date_from) if date_from else None, shift_year(date_to)))
+        else:
+            raise ValueError(f"unknown comparison {label}")
+    return periods
+
+
+def financial_statement(statement, date_from=None, date_to=None, compare=()):
+    """Balance sheet or income statement by account_Type/category, every period in one grouped query.
+
+    The balance sheet is cumulative to each date_to and folds income/expense into current earnings.
+    """
+    if statement not in STATEMENT_TYPES:
+        raise ValueError(f"unknown statement {statement}")
+    balance_sheet = statement == "balance_sheet"
+    periods = statement_periods(date_from, date_to, compare)
+
+    totals = {}
+    scan = Q(journalentry__accounting_date__lte=max(period[2] for period in periods))
+    for i, (label, start, end) in enumerate(periods):
+        period_filter = Q(journalentry__accounting_date__lte=end)
+        if start and not balance_sheet:
+            period_filter &= Q(journalentry__accounting_date__gte=start)
+        totals[f"debit_{i}"] = Sum('debit', filter=period_filter)
+        totals[f"credit_{i}"] = Sum('credit', filter=period_filter)
+
+    if not balance_sheet:
+        scan &= Q(account__account_Type__in=STATEMENT_TYPES[statement])
+        starts = [period[1] for period in periods]
+        if all(starts):
+            scan &= Q(journalentry__accounting_date__gte=min(starts))
+
+    rows = (JournalItems.objects.filter(scan)
+            .values('account__account_Type', 'account__category')
+            .annotate(**totals)
+            .order_by('account__account_Type', 'account__category'))
+
+    zero = [Decimal('0.00')] * len(periods)
+    sections = {account_type: {} for account_type in STATEMENT_TYPES[statement]}
+    earnings = list(zero)
+    for row in rows:
+        account_type = row['account__account_Type']
+        sign = 1 if account_type in DEBIT_NORMAL_TYPES else -1
+        amounts = [sign * ((row[f'debit_{i}'] or 0) - (row[f'credit_{i}'] or 0)) for i in range(len(periods))]
+        if account_type in sections:
+            sections[account_type][row['account__category']] = amounts
+        if account_type in ("income", "expense"):
+            earnings = [e + (a if account_type == "income" else -a) for e, a in zip(earnings, amounts)]
+
+    if balance_sheet:
+        sections["equity"]["current earnings"] = earnings
+
+    DATA = {
+        "statement":statement,
+        "periods":[{"label":label, "date_from":start, "date_to":end} for label, start, end in periods],
+        "sections":[],
+    }
+    section_totals = {}
+    for account_type, categories in sections.items():
+        section_totals[account_type] = [sum(column, Decimal('0.00')) for column in zip(zero, *categories.values())]
+        DATA["sections"].append({
+            "account_Type":account_type,
+            "categories":[{"category":category, "amounts":amounts} for category, amounts in categories.items()],
+            "totals":section_totals[account_type],
+        })
+
+    if balance_sheet:
+        DATA["total_assets"] = section_totals["asset"]
+        DATA["total_liabilities_and_equity"] = [l + e for l, e in zip(section_totals["liability"], section_totals["equity"])]
+    else:
+        DATA["net_income"] = earnings
+    return DATA
+
+
+@api_view(['GET'])
+@report_view
+def financial_statement_view(request):
+    compare = request.query_params.get('compare')
+    try:
+        DATA = financial_statement(
+            request.query_params.get('statement', 'income_statement'),
+            date_from=request.query_params.get('date_from'),
+            date_to=request.query_params.get('date_to'),
+            compare=[label for label in compare.split(',') if label] if compare else (),
+        )
+    except ValueError as e:
+        return Response({"msg":str(e)},status=400)
     return Response(DATA)
 
+
+AGING_BUCKETS = (
+    ("0_30", None, 30),
+    ("31_60", 31, 60),
+    ("61_90", 61, 90),
+    ("90_plus", 91, None),
+)
+
+
+def money(value):
+    return Decimal(str(value or 0)).quantize(Decimal("0.01"))
+
+
+class QueryParamError(ValueError):
+    pass
+
+
+def query_date(request, name):
+    """A YYYY-MM-DD query parameter as a date, None when absent; QueryParamError for anything else"""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        # parse_date returns None for a bad format and raises for an impossible date such as 2025-02-30
+        parsed = as_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise QueryParamError(f"{name} must be YYYY-MM-DD")
+    return parsed
+
+
+def query_id(request, name):
+    """A numeric id query parameter, None when absent; QueryParamError for anything else"""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise QueryParamError(f"{name} must be a number")
+
+
+def open_residuals(documents, payments):
+    """documents annotated with residual (total less payments) and due (Due_Date, else invoice_Date), residual > 0 only"""
+    paid = payments.filter(invoice=OuterRef('pk')).order_by().values('invoice').annotate(paid=Sum('amount')).values('paid')
+    return (documents
+            .annotate(residual=F('total') - Coalesce(Subquery(paid), Decimal('0.00')),
+                      due=Coalesce('Due_Date', 'invoice_Date'))
+            .filter(residual__gt=0))
+
+
+def bucketed(open_documents, buckets, *group):
+    """Residual total and document count per (group, bucket); buckets maps a label to a Q on due.
+
+    The bucket is a CASE over due, so each document's residual is summed once.
+    """
+    label = Case(*[When(condition, then=Value(name)) for name, condition in buckets.items()], output_field=CharField())
+    return (open_documents
+            .annotate(bucket=label)
+            .values(*group, 'bucket')
+            .annotate(invoices=Count('id'), amount=Sum('residual'))
+            .order_by(*group))
+
+
+def aging_report(open_documents, party, as_of=None):
+    """Bucket outstanding amounts by days past due, per party, in one grouped query.
+
+    open_documents comes from open_residuals; documents not yet due fall in 0_30.
+    """
+    as_of = as_of or datetime.date.today()
+    buckets = {}
+    for name, low, high in AGING_BUCKETS:
+        condition = Q()
+        if low is not None:
+            condition &= Q(due__lte=as_of - datetime.timedelta(days=low))
+        if high is not None:
+            condition &= Q(due__gt=as_of - datetime.timedelta(days=high + 1))
+        buckets[name] = condition
+
+    names = list(buckets)
+    totals = dict.fromkeys(names + ["total"], Decimal("0.00"))
+    results = {}
+    for row in bucketed(open_documents, buckets, f"{party}__name", f"{party}_id"):
+        party_id = row[f"{party}_id"]
+        if party_id not in results:
+            results[party_id] = {f"{party}_id":party_id, party:row[f"{party}__name"], "invoices":0, "total":Decimal("0.00")}
+            results[party_id].update(dict.fromkeys(names, Decimal("0.00")))
+        result = results[party_id]
+        amount = money(row["amount"])
+        result["invoices"] += row["invoices"]
+        result[row["bucket"]] += amount
+        result["total"] += amount
+        totals[row["bucket"]] += amount
+        totals["total"] += amount
+
+    return {"as_of":as_of, "results":list(results.values()), "totals":totals}
+
+
+def ar_aging(as_of=None):
+    """Open sales invoices (total less paid customer payments) aged by Due_Date, per customer"""
+    open_invoices = open_residuals(
+        salesInvoice.objects.filter(Status__in=[InvoiceStatus.POSTED, InvoiceStatus.PAID]),
+        customer_payment.objects.filter(status=paymentstatus.PAID),
+    )
+    return aging_report(open_invoices, "customer", as_of)
+
+
+@api_view(['GET'])
+@report_view
+def ar_aging_view(request):
+    try:
+        as_of = query_date(request, 'as_of')
+    except QueryParamError as e:
+        return Response({"msg":str(e)},status=400)
+    return Response(ar_aging(as_of))
+
+
+def ap_open_bills():
+    """Open purchase bills with their residual (total less paid linked vendor payments) and due date"""
+    return open_residuals(
+        purchaseinvoice.objects.filter(Status__in=[purchaseInvoiceStatus.POSTED, purchaseInvoiceStatus.PAID]),
+        vendor_payment.objects.filter(status=vendorpaymentstatus.PAID),
+    )
+
+
+def ap_aging(as_of=None):
+    """Open purchase bills aged by due date, per vendor"""
+    return aging_report(ap_open_bills(), "vendor", as_of)
+
+
+FORECAST_MAX_WEEKS = 52
+
+
+def cash_forecast(weeks=8, as_of=None):
+    """Cash needed to settle open bills: overdue, each of the next weeks, and later, in one query"""
+    as_of = as_of or datetime.date.today()
+    periods = []
+    buckets = {"overdue":Q(due__lt=as_of)}
+    for week in range(weeks):
+        start = as_of + datetime.timedelta(days=7 * week)
+        end = start + datetime.timedelta(days=6)
+        buckets[f"week_{week}"] = Q(due__gte=start, due__lte=end)
+        periods.append((start, end))
+    buckets["later"] = Q(due__gt=as_of + datetime.timedelta(days=7 * weeks - 1))
+
+    sums = dict.fromkeys(buckets, Decimal("0.00"))
+    for row in bucketed(ap_open_bills(), buckets):
+        sums[row["bucket"]] = money(row["amount"])
+    amounts = [sums[f"week_{week}"] for week in range(weeks)]
+
+    return {
+        "as_of":as_of,
+        "overdue":sums["overdue"],
+        "weeks":[{"week_start":start, "week_end":end, "amount":amount} for (start, end), amount in zip(periods, amounts)],
+        "later":sums["later"],
+        "total":sum(sums.values(), Decimal("0.00")),
+    }
+
+
 @api_view(['GET'])
+@report_view
+def ap_aging_view(request):
+    try:
+        as_of = query_date(request, 'as_of')
+    except QueryParamError as e:
+        return Response({"msg":str(e)},status=400)
+    return Response(ap_aging(as_of))
+
+
+@api_view(['GET'])
+@report_view
+def cash_forecast_view(request):
+    weeks = request.query_params.get('weeks', '8')
+    try:
+        as_of = query_date(request, 'as_of')
+    except QueryParamError as e:
+        return Response({"msg":str(e)},status=400)
+    if not weeks.isdigit() or not 1 <= int(weeks) <= FORECAST_MAX_WEEKS:
+        return Response({"msg":f"weeks must be between 1 and {FORECAST_MAX_WEEKS}"},status=400)
+    return Response(cash_forecast(int(weeks), as_of))
+
+
+RECONCILE_MAX_ROWS = 500
+
+
+def reconcile_response(targets, fix=False):
+    """Drift per target: a count plus the first RECONCILE_MAX_ROWS rows"""
+    report = {}
+    for target in targets:
+        rows, count = [], 0
+        for row in reconcile(target, fix=fix):
+            count += 1
+            if len(rows) < RECONCILE_MAX_ROWS:
+                rows.append({key: row[key] for key in ("id", "label", "stored", "expected", "difference")})
+        report[target] = {"count": count, "rows": rows}
+    return Response({"fixed": fix, "targets": report}, status=200)
+
+
+def reconcile_targets(request):
+    targets = [name.strip() for name in request.query_params.get('target', '').split(',') if name.strip()]
+    unknown = [name for name in targets if name not in RECONCILE_TARGETS]
+    if unknown:
+        raise ValueError(f"target must be one of: {', '.join(RECONCILE_TARGETS)}")
+    return targets or list(RECONCILE_TARGETS)
+
+
+@api_view(['GET'])
+@report_view
+def reconcile_balances(request):
+    try:
+        targets = reconcile_targets(request)
+    except ValueError as e:
+        return Response({"msg":str(e)},status=400)
+    return reconcile_response(targets)
+
+
+# fixes lock and rewrite rows, so unlike the report they always read the primary
+@api_view(['POST'])
+def reconcile_balances_fix(request):
+    try:
+        targets = reconcile_targets(request)
+    except ValueError as e:
+        return Response({"msg":str(e)},status=400)
+    return reconcile_response(targets, fix=True)
+
+
+def subtree_total(items, field):
+    return Coalesce(Subquery(items.annotate(total=Func(F(field), function='SUM')).values('total')[:1]), Decimal('0.00'))
+
+
+def account_rollup(account=None, date_from=None, date_to=None):
+    """Subtree debit/credit totals for an account and its children (or every root), in one query"""
+    items = JournalItems.objects.filter(**subtree_range(OuterRef('path'), prefix='account__')).order_by()
+    if date_from:
+        items = items.filter(journalentry__accounting_date__gte=date_from)
+    if date_to:
+        items = items.filter(journalentry__accounting_date__lte=date_to)
+
+    nodes = Account.objects.filter(Q(id=account) | Q(parent_id=account)) if account else Account.objects.filter(parent__isnull=True)
+    nodes = (nodes
+             .annotate(total_debit=subtree_total(items, 'debit'), total_credit=subtree_total(items, 'credit'))
+             .values('id', 'code', 'name', 'account_Type', 'category', 'parent_id', 'depth', 'total_debit', 'total_credit')
+             .order_by('path'))
+
+    node = None
+    children = []
+    for row in nodes:
+        row['balance'] = row['total_debit'] - row['total_credit']
+        if account and row['id'] == account:
+            node = row
+        else:
+            children.append(row)
+
+    return {"account":node, "children":children}
+
+
+@api_view(['GET'])
+@report_view
+def account_rollup_view(request):
+    try:
+        account = query_id(request, 'account')
+        date_from = query_date(request, 'date_from')
+        date_to = query_date(request, 'date_to')
+    except QueryParamError as e:
+        return Response({"msg":str(e)},status=400)
+    DATA = account_rollup(account=account, date_from=date_from, date_to=date_to)
+    if account and DATA['account'] is None:
+        return Response({"msg":"account not found"},status=400)
+    return Response(DATA)
+
+
+LEDGER_PAGE_SIZE = 100
+LEDGER_MAX_PAGE_SIZE = 1000
+
+
+def ledger_opening_balance(account_id, date_from=None):
+    """Balance of the account before date_from: latest snapshot plus the items after it"""
+    if not date_from:
+        return Decimal("0.00")
+
+    items = JournalItems.objects.filter(account_id=account_id, journalentry__accounting_date__lt=date_from)
+    opening = Decimal("0.00")
+    snapshot = latest_closed_period(as_date(date_from) - datetime.timedelta(days=1))
+    if snapshot:
+        row = snapshot.balances.filter(account_id=account_id).values_list('debit','credit').first()
+        if row:
+            opening = row[0] - row[1]
+        items = items.filter(journalentry__accounting_date__gt=snapshot.end_date)
+
+    totals = items.aggregate(debit=Sum('debit'), credit=Sum('credit'))
+    return opening + (totals['debit'] or Decimal("0.00")) - (totals['credit'] or Decimal("0.00"))
+
+
+@api_view(['GET'])
+@report_view
 def genaral_ledger(request,id):
+    cursor = request.query_params.get('cursor')
+    try:
+        date_from = query_date(request, 'date_from')
+        date_to = query_date(request, 'date_to')
+    except QueryParamError as e:
+        return Response({"msg":str(e)},status=400)
+    try:
+        limit = min(int(request.query_params.get('limit', LEDGER_PAGE_SIZE)), LEDGER_MAX_PAGE_SIZE)
+    except ValueError:
+        return Response({"msg":"limit must be a number"},status=400)
+    if limit < 1:
+        return Response({"msg":"limit must be at least 1"},status=400)
 
     items =(JournalItems.objects.filter(account_id=id).select_related("journalentry").order_by("journalentry__accounting_date",'id'))
+    if date_from:
+        items = items.filter(journalentry__accounting_date__gte=date_from)
+    if date_to:
+        items = items.filter(journalentry__accounting_date__lte=date_to)
+
+    if cursor:
+        # the cursor carries the running balance, so a deep page never re-sums the rows before it
+        try:
+            position = signing.loads(cursor, salt='genaral_ledger')
+        except signing.BadSignature:
+            return Response({"msg":"invalid cursor"},status=400)
+        if position['account'] != id:
+            return Response({"msg":"invalid cursor"},status=400)
+        items = items.filter(
+            Q(journalentry__accounting_date__gt=position['date']) |
+            Q(journalentry__accounting_date=position['date'], id__gt=position['id'])
+        )
+        opening_balance = Decimal(position['balance'])
+    else:
+        opening_balance = ledger_opening_balance(id, date_from)
+
+    page = list(items[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
 
     ledger = []
 
-    running_balance = 0
-    for line in items:
+    running_balance = opening_balance
+    for line in page:
         debit = line.debit or 0
         credit =line.credit or 0
         running_balance += debit - credit
@@ -377,7 +956,58 @@ def genaral_ledger(request,id):
             "balance":running_balance
 
         })
-    return Response(ledger,status=200)
+
+    next_cursor = None
+    if has_more:
+        last = page[-1]
+        next_cursor = signing.dumps({
+            "account":id,
+            "date":last.journalentry.accounting_date.isoformat(),
+            "id":last.id,
+            "balance":str(running_balance),
+        }, salt='genaral_ledger')
+
+    return Response({
+        "account":id,
+        "opening_balance":opening_balance,
+        "results":ledger,
+        "next_cursor":next_cursor,
+        "has_more":has_more
+    },status=200)
+
+
+
+
+##fiscal periods##
+@api_view(['POST'])
+def period_create(request):
+    name = request.data.get('name')
+    start_date = request.data.get('start_date')
+    end_date = request.data.get('end_date')
+
+    if not name or not start_date or not end_date:
+        return Response({"msg":"name, start_date and end_date are required"},status=400)
+
+    period = FiscalPeriod.objects.create(name=name,start_date=start_date,end_date=end_date)
+    return Response({"msg":"period created successfully","id":period.id},status=201)
+
+
+@api_view(['GET'])
+def period_list(request):
+    periods = FiscalPeriod.objects.order_by('start_date').values('id','name','start_date','end_date','is_closed','closed_at')
+    return Response(list(periods),status=200)
+
+
+@api_view(['POST'])
+def period_close(request,id):
+    period = FiscalPeriod.objects.filter(id=id).first()
+    if not period:
+        return Response({"msg":"period not found"},status=400)
+    try:
+        period = close_period(period)
+    except PeriodClosedError as e:
+        return Response({"msg":str(e)},status=400)
+    return Response({"msg":"period closed successfully","id":period.id,"closed_at":period.closed_at},status=200)
 
 
 
@@ -430,9 +1060,10 @@ def create_customer(request):
 
 @api_view(['GET'])
 def customers_list(request):
-    list =customers.objects.all()
-    serializer = customersSerializer(list,many=True)
-    return Response(serializer.data)
+    return list_page(request, customers.objects.all(), 'customers_list',
+                     serializer_class=customersSerializer,
+                     orderable=('id','name','email'),
+                     filters={'email':'email'})
 
 
 
@@ -505,17 +1136,15 @@ def customer_delete(request,name):
 
 #csv#
 def customer_export(request):
-    response =HttpResponse(content_type='text/csv')
+    fields = ['name','email','phone','address','City','state','Country','Zip_code','status','gstin','pan','tax_id','credit_limit','notes','website']
 
-    response['content-Disposition'] ='attachment; filename="customer.csv"'
+    customer_qs = customers.objects.order_by('id')
+    if request.GET.get('status'):
+        customer_qs = customer_qs.filter(status=request.GET['status'])
+    if request.GET.get('Country'):
+        customer_qs = customer_qs.filter(Country=request.GET['Country'])
 
-    writer =csv.writer(response)
-    writer.writerow(['name','email','phone','address','City','state','Country','Zip_code','status','gstin','pan','tax_id','credit_limit','notes','website']) 
-
-    for cust in customers.objects.all():
-            writer.writerow([cust.name,cust.email,cust.phone,cust.address,cust.City,cust.state,cust.Country,cust.Zip_code,cust.status,cust.gstin,cust.pan,cust.tax_id,cust.credit_limit,cust.notes,cust.website]) 
-
-    return response
+    return stream_csv("customer.csv", fields, export_rows(customer_qs, fields))
 
 
 @api_view(['POST'])
@@ -645,18 +1274,8 @@ def product_create(request):
 
 @api_view(['GET'])
 def product_view(request):
-    product_details = product.objects.all()
-
-    if not product_details:
-        return Response({'product details not found'},status=400)
-    list=[]
-    for prod in product_details:
-        list.append({
-            "id":prod.id,
-            "name":prod.Name,
-            "price":prod.price
-        })
-    return Response(list,status=200)
+    return list_page(request, product.objects.all(), 'product_view',
+                     fields={'id':'id','name':'Name','price':'price'})
     
 
 @api_view(['PUT'])
@@ -697,6 +1316,56 @@ def invoice_create(request):
     return Response(serializer.errors, status=400)
 
 
+IMPORT_EXTENSIONS = (".csv", ".xlsx")
+
+
+@api_view(['POST'])
+def invoice_import(request):
+    upload = request.FILES.get('file')
+    if not upload:
+        return Response({"msg":"file is required"},status=400)
+    extension = os.path.splitext(upload.name)[1].lower()
+    if extension not in IMPORT_EXTENSIONS:
+        return Response({"msg":"file must be .csv or .xlsx"},status=400)
+
+    # the worker reads from disk, so the request only copies the upload
+    directory = getattr(settings, "INVOICE_IMPORT_DIR", tempfile.gettempdir())
+    with tempfile.NamedTemporaryFile(dir=directory, prefix="invoice-import-", suffix=extension, delete=False) as handle:
+        for chunk in upload.chunks():
+            handle.write(chunk)
+
+    job = InvoiceImport.objects.create(file_name=upload.name, path=handle.name)
+    start_import(job)
+    return Response({"msg":"invoice import queued","id":job.id},status=202)
+
+
+@api_view(['GET'])
+def invoice_import_status(request,id):
+    job = InvoiceImport.objects.filter(id=id).defer('errors').first()
+    if not job:
+        return Response({"msg":"import not found"},status=400)
+    return Response({
+        "id":job.id,
+        "file_name":job.file_name,
+        "status":job.status,
+        "total_rows":job.total_rows,
+        "processed_rows":job.processed_rows,
+        "failed_rows":job.failed_rows,
+        "created_invoices":job.created_invoices,
+        "progress":round(job.processed_rows * 100 / job.total_rows, 1) if job.total_rows else 0,
+        "created_at":job.created_at,
+        "finished_at":job.finished_at,
+    },status=200)
+
+
+@api_view(['GET'])
+def invoice_import_errors(request,id):
+    job = InvoiceImport.objects.filter(id=id).only('id','errors','failed_rows').first()
+    if not job:
+        return Response({"msg":"import not found"},status=400)
+    return Response({"id":job.id,"failed_rows":job.failed_rows,"errors":job.errors},status=200)
+
+
 @api_view(['GET'])
 def invoice_details(request):
     invoice =salesInvoice.objects.all()
@@ -721,9 +1390,48 @@ def invoice_details(request):
 
 @api_view(['GET'])
 def invoice_list(request):
-    list =salesInvoice.objects.all()
-    serializer = InvoiceSerializer(list,many=True)
-    return Response(serializer.data)
+    return list_page(request, salesInvoice.objects.all(), 'invoice_list',
+                     serializer_class=InvoiceSerializer,
+                     orderable=('id','invoice_Date'),
+                     filters={'customer':'customer_id',
+                              'date_from':'invoice_Date__gte',
+                              'date_to':'invoice_Date__lte'})
+
+
+def filter_invoices(queryset, request, partner_field):
+    """Apply the export filters; QueryParamError for a non-numeric partner id or a bad date"""
+    partner = query_id(request, partner_field)
+    date_from = query_date(request, 'date_from')
+    date_to = query_date(request, 'date_to')
+    if request.GET.get('status'):
+        queryset = queryset.filter(Status=request.GET['status'])
+    if partner:
+        queryset = queryset.filter(**{f"{partner_field}_id":partner})
+    if date_from:
+        queryset = queryset.filter(invoice_Date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(invoice_Date__lte=date_to)
+    return queryset
+
+
+def invoice_export(request):
+    fields = ['id','customer__name','invoice_Date','Due_Date','payments_terms','Status','total','journals__journal_name']
+    try:
+        invoices = filter_invoices(salesInvoice.objects.order_by('id'), request, 'customer')
+    except QueryParamError as e:
+        return JsonResponse({"msg":str(e)},status=400)
+    header = ['id','customer','invoice_Date','Due_Date','payments_terms','Status','total','journal']
+    return stream_csv("invoice.csv", header, export_rows(invoices, fields))
+
+
+def vendor_invoice_export(request):
+    fields = ['id','vendor__name','invoice_Date','Due_Date','payments_terms','Status','total','journals__journal_name']
+    try:
+        invoices = filter_invoices(purchaseinvoice.objects.order_by('id'), request, 'vendor')
+    except QueryParamError as e:
+        return JsonResponse({"msg":str(e)},status=400)
+    header = ['id','vendor','invoice_Date','Due_Date','payments_terms','Status','total','journal']
+    return stream_csv("vendor_invoice.csv", header, export_rows(invoices, fields))
 
 
 @api_view(['PUT'])
@@ -865,29 +1573,11 @@ def vendor_create(request):
 
 @api_view(['GET'])
 def vendor_details(request):
-    try:
-        vendor_details = vendor.objects.all()
-
-        if not vendor_details:
-            return Response ({"msg":"vendor details is not found"},status=200)
-        
-
-        ven=[]
-        for data in vendor_details:
-            ven.append({
-                "id":data.id,
-                "name":data.name,
-                "email":data.email,
-                "category":data.Category,
-                "status":data.status,
-                "phone":data.phone,
-                "current_balance":data.current_balance,
-            
-            })
-        return Response(ven,status=200)
-        
-    except Exception as e:
-        return Response({"msg":"vendor details is {str:{e}}"},status=400)    
+    return list_page(request, vendor.objects.all(), 'vendor_details',
+                     fields={'id':'id','name':'name','email':'email','category':'Category','status':'status',
+                             'phone':'phone','current_balance':'current_balance'},
+                     orderable=('id','name','email'),
+                     filters={'email':'email'})
 
 
     
@@ -932,6 +1622,18 @@ def vendor_delete(request,name):
 
 
 
+def vendor_export(request):
+    fields = ['name','Company_name','email','phone','Category','address','city','state','zipcode','country','tax_id','payment','current_balance','status','notes']
+
+    vendors = vendor.objects.order_by('id')
+    if request.GET.get('status'):
+        vendors = vendors.filter(status=request.GET['status'])
+    if request.GET.get('Category'):
+        vendors = vendors.filter(Category=request.GET['Category'])
+
+    return stream_csv("vendor.csv", fields, export_rows(vendors, fields))
+
+
 
 #productvendor
 @api_view(['POST'])
@@ -1060,21 +1762,13 @@ def vendor_payment_create(request):
 
 @api_view(['GET'])
 def vendor_payment_details(request):
-    vendor_details =vendor_payment.objects.all()
-
-    dispaly=[]
-    for dis in vendor_details:
-        dispaly.append({
-            "vendors":dis.vendors,
-            "invoice":dis.invoice,
-            "payment_date":dis.payment_date,
-            "amount":dis.amount,
-            "journal":dis.journal,
-            "reference":dis.reference,
-            "status":dis.status
-        })
-
-    return Response(dispaly,status=200)
+    return list_page(request, vendor_payment.objects.all(), 'vendor_payment_details',
+                     fields={'id':'id','vendors':'vendors','invoice':'invoice','payment_date':'payment_date',
+                             'amount':'amount','journal':'journal','reference':'reference','status':'status'},
+                     orderable=('id','payment_date'),
+                     filters={'vendor':'vendors_id','invoice':'invoice_id',
+                              'date_from':'payment_date__gte',
+                              'date_to':'payment_date__lte'})
 
 
 @api_view(['DELETE'])
@@ -1143,7 +1837,52 @@ def recent_vendor_payments(request):
     serializer = vendor_paymentSerializer(vendor_payments, many=True)
     return Response(serializer.data, status=200)
 
-#
 
+def dashboard_totals():
+    """All dashboard counters in three aggregates.
+
+    Every sales invoice has a customer and every bill a vendor, so revenue and expense are
+    summed over the reverse join in the same aggregate that counts the partners.
+    """
+    zero = Decimal('0.00')
+    sales = customers.objects.aggregate(total_customers=Count('id', distinct=True),
+                                        total_revenue=Sum('salesinvoice__total', default=zero))
+    purchases = vendor.objects.aggregate(total_vendors=Count('id', distinct=True),
+                                         total_expense=Sum('purchaseinvoice__total', default=zero))
+    revenue = money(sales['total_revenue'])
+    expense = money(purchases['total_expense'])
+    return {
+        "total_revenue":revenue,
+        "total_expense":expense,
+        "net_profit":revenue - expense,
+        "total_customers":sales['total_customers'],
+        "total_vendors":purchases['total_vendors'],
+        "total_products":product.objects.count(),
+    }
+
+
+def dashboard_data():
+    data = dashboard_totals()
+    data["recent_invoices"] = list(
+        salesInvoice.objects.order_by('-invoice_Date','-id')
+        .values('id','customer','customer__name','invoice_Date','Due_Date','Status','total')[:5])
+    data["recent_payments"] = list(
+        customer_payment.objects.order_by('-payment_date','-id')
+        .values('id','customer','customer__name','invoice','payment_date','amount','reference','status')[:5])
+    data["recent_vendor_invoices"] = list(
+        purchaseinvoice.objects.order_by('-invoice_Date','-id')
+        .values('id','vendor','vendor__name','invoice_Date','Due_Date','Status','total')[:5])
+    data["recent_vendor_payments"] = list(
+        vendor_payment.objects.order_by('-payment_date','-id')
+        .values('id','vendors','vendors__name','invoice','payment_date','amount','reference','status')[:5])
+    return data
 
 
+@api_view(['GET'])
+@report_view
+def dashboard(request):
+    data = cache.get(DASHBOARD_CACHE_KEY)
+    if data is None:
+        data = dashboard_data()
+        cache.set(DASHBOARD_CACHE_KEY, data, settings.DASHBOARD_CACHE_TTL)
+    return Response(data, status=200)
@@ -0,0 +1,58 @@
+"""
+Database routing for report views and SQLite connection tuning.
+
+Report views are wrapped with ``report_view`` so that, while they run, every
+read is sent to the ``replica`` alias when one is configured. Writes and
+everything outside those views stay on ``default``.
+"""
+import contextvars
+from functools import wraps
+
+from django.conf import settings
+
+REPLICA_ALIAS = 'replica'
+
+_reading_reports = contextvars.ContextVar('reading_reports', default=False)
+
+
+def report_view(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _reading_reports.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _reading_reports.reset(token)
+    return wrapper
+
+
+def report_database():
+    if _reading_reports.get() and REPLICA_ALIAS in settings.DATABASES:
+        return REPLICA_ALIAS
+    return 'default'
+
+
+class ReportReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return report_database()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """busy_timeout makes writers wait instead of failing; WAL (persistent, so opt-in via SQLITE_WAL) lets readers run alongside the writer"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        if settings.SQLITE_WAL:
+            cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute(f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}')
+        cursor.execute('PRAGMA synchronous=NORMAL')
@@ -11,6 +11,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -81,12 +83,65 @@ WSGI_APPLICATION = 'api.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=sqlite (default) keeps the local db.sqlite3 file. DB_ENGINE=postgres
+# reads the connection from DB_NAME/DB_USER/DB_PASSWORD/DB_HOST/DB_PORT, and
+# DB_REPLICA_HOST (optional) adds a read replica used by the report views.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes')
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+# WAL lets readers run alongside the writer, but the mode is stored in the database file
+# itself, so it is opt-in: SQLITE_WAL=1 converts whatever DB_NAME points at on first connect.
+# Leave it off for the checked-in db.sqlite3.
+SQLITE_WAL = os.environ.get('SQLITE_WAL', '').lower() in ('1', 'true', 'yes')
+
+
+def postgres_database(host):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('DB_NAME', 'erp'),
+        'USER': os.environ.get('DB_USER', 'erp'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': host,
+        'PORT': os.environ.get('DB_PORT', '5432'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
     }
-}
+    if DB_POOL:
+        # psycopg's pool replaces persistent connections; Django rejects both together
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        }
+    return database
+
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': postgres_database(os.environ.get('DB_HOST', 'localhost')),
+    }
+    if os.environ.get('DB_REPLICA_HOST'):
+        DATABASES['replica'] = postgres_database(os.environ['DB_REPLICA_HOST'])
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # take the write lock when the transaction starts instead of failing on upgrade
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+            # a file, not shared-cache memory, so concurrent test writers wait on the lock like production
+            'TEST': {'NAME': os.environ.get('DB_TEST_NAME', BASE_DIR / 'test_db.sqlite3')},
+        }
+    }
+
+DATABASE_ROUTERS = ['api.db_router.ReportReplicaRouter']
 
 
 # Password validation
@@ -143,6 +198,38 @@ EMAIL_HOST_PASSWORD = 'osxv lahc orpj cgme'  # Use app password, not your Gmail
 
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds the combined /account/dashboard/ payload is cached
+DASHBOARD_CACHE_TTL = 60
+
+
+# Debit/credit account codes used when invoices and payments are posted
+ACCOUNT_POSTING_RULES = {
+    "sales_invoice": {"debit": "1000", "credit": "4000"},
+    "customer_payment": {"debit": "1200", "credit": "1000"},
+    "purchase_invoice": {"debit": "5000", "credit": "2000"},
+    "vendor_payment": {"debit": "2000", "credit": "1200"},
+}
+
+# Currency the books are kept in, and the largest debit/credit difference a journal entry
+# may carry per currency (0.00 means entries must balance exactly)
+ACCOUNT_CURRENCY = os.environ.get('ACCOUNT_CURRENCY', 'INR')
+JOURNAL_BALANCE_TOLERANCE = {
+    "INR": "0.00",
+    "USD": "0.00",
+    "JPY": "0",
+}
+
+# Background invoice imports: worker threads per process and where uploads wait to be read
+INVOICE_IMPORT_WORKERS = int(os.environ.get('INVOICE_IMPORT_WORKERS', 2))
+INVOICE_IMPORT_DIR = os.environ.get('INVOICE_IMPORT_DIR', tempfile.gettempdir())
+
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
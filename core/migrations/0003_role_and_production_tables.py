@@ -0,0 +1,166 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_user_profile_picture'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='account_page',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('inv_on', models.CharField(blank=True, max_length=100, null=True)),
+                ('Date', models.DateField(auto_now_add=True)),
+                ('Amount', models.DecimalField(blank=True, decimal_places=2, default=0, max_digits=10, max_length=100, null=True)),
+                ('mode_of_pay', models.CharField(blank=True, max_length=20, null=True)),
+                ('mat_inspected', models.CharField(blank=True, max_length=100, null=True)),
+                ('mat_received', models.CharField(blank=True, max_length=100, null=True)),
+                ('process_plan', models.CharField(blank=True, max_length=100, null=True)),
+                ('process_approve', models.CharField(blank=True, max_length=100, null=True)),
+                ('remark', models.CharField(blank=True, max_length=50, null=True)),
+                ('status', models.CharField(max_length=20)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='accountent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=30, null=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True)),
+                ('password', models.CharField(blank=True, max_length=30, null=True)),
+                ('role_type', models.CharField(default='accountent', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Admin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=30, null=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True)),
+                ('password', models.CharField(blank=True, max_length=30, null=True)),
+                ('role_type', models.CharField(default='Admin', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='plan_product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('program_no', models.CharField(blank=True, max_length=30, null=True)),
+                ('lm_co1', models.BooleanField(default=False)),
+                ('lm_co2', models.BooleanField(default=False)),
+                ('lm_co3', models.BooleanField(default=False)),
+                ('fm_co1', models.BooleanField(default=False)),
+                ('fm_co2', models.BooleanField(default=False)),
+                ('fm_co3', models.BooleanField(default=False)),
+                ('status', models.CharField(default='incomplete', max_length=20)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=30, null=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True)),
+                ('password', models.CharField(blank=True, max_length=30, null=True)),
+                ('role_type', models.CharField(default='product', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='product_details',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('Company_name', models.CharField(blank=True, max_length=30, null=True)),
+                ('serial_number', models.CharField(blank=True, max_length=30, null=True)),
+                ('date', models.DateField(auto_now_add=True)),
+                ('Customer_name', models.CharField(blank=True, max_length=30, null=True)),
+                ('Customer_No', models.CharField(blank=True, max_length=30, null=True)),
+                ('Customer_date', models.DateField(blank=True, null=True)),
+                ('mobile', models.CharField(blank=True, max_length=30, null=True)),
+                ('status', models.CharField(blank=True, max_length=30, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='product_material',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('material_Description', models.CharField(blank=True, max_length=100, null=True)),
+                ('Quantity', models.IntegerField(blank=True, null=True)),
+                ('Remarks', models.CharField(blank=True, max_length=100, null=True)),
+                ('product_detail', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.product_details')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='product_options',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.BooleanField(blank=True, max_length=30, null=True)),
+                ('Thick', models.BooleanField(blank=True, max_length=30, null=True)),
+                ('Grade', models.BooleanField(blank=True, max_length=30, null=True)),
+                ('Drawing', models.BooleanField(blank=True, max_length=30, null=True)),
+                ('Test_Certificate', models.BooleanField(blank=True, max_length=30, null=True)),
+                ('product_material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.product_material')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QA',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=30, null=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True)),
+                ('password', models.CharField(blank=True, max_length=30, null=True)),
+                ('role_type', models.CharField(default='QA', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='role1',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=30, null=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True)),
+                ('password', models.CharField(blank=True, max_length=30, null=True)),
+                ('role_type', models.CharField(default='role1', max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='schedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('commitment_date', models.DateField()),
+                ('planning_date', models.DateField()),
+                ('date_of_inspection', models.DateField()),
+                ('date_of_delivery', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='schedule_process',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('process', models.CharField(blank=True, max_length=100, null=True)),
+                ('process_date', models.DateField()),
+                ('cycle_time', models.TimeField(blank=True, null=True)),
+                ('operator_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('remark', models.CharField(blank=True, max_length=100, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='plan_product',
+            name='product_detail',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.product_details'),
+        ),
+        migrations.AddField(
+            model_name='schedule',
+            name='product_plan',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.plan_product'),
+        ),
+        migrations.AddField(
+            model_name='schedule_process',
+            name='schedule_name',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.schedule'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:58
+
+from django.contrib.auth.hashers import make_password
+from django.db import migrations, models
+
+
+ROLE_TABLES = ['role1', 'QA', 'product', 'Admin', 'accountent']
+
+
+def fold_role_tables(apps, schema_editor):
+    identity = apps.get_model('core', 'identity')
+    usernames = set()
+    emails = set()
+    rows = []
+    for model_name in ROLE_TABLES:
+        for user in apps.get_model('core', model_name).objects.order_by('id'):
+            username = user.username or f"{model_name}_{user.id}"
+            if username in usernames:
+                # the same name existed under two roles; keep both logins distinct
+                username = f"{username}_{model_name}"[:30]
+            email = user.email or None
+            if email in emails:
+                email = None
+            usernames.add(username)
+            if email:
+                emails.add(email)
+            rows.append(identity(
+                username=username,
+                email=email,
+                password=make_password(user.password),
+                role_type=model_name,
+            ))
+    identity.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_role_and_production_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='identity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=30, unique=True)),
+                ('email', models.EmailField(blank=True, max_length=100, null=True, unique=True)),
+                ('password', models.CharField(max_length=128)),
+                ('role_type', models.CharField(choices=[('role1', 'role1'), ('QA', 'QA'), ('product', 'product'), ('Admin', 'Admin'), ('accountent', 'accountent')], max_length=10)),
+            ],
+        ),
+        migrations.RunPython(fold_role_tables, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='accountent',
+        ),
+        migrations.DeleteModel(
+            name='Admin',
+        ),
+        migrations.DeleteModel(
+            name='product',
+        ),
+        migrations.DeleteModel(
+            name='QA',
+        ),
+        migrations.DeleteModel(
+            name='role1',
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:58
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # core.user was removed from models.py before identity existed; this drops
+    # its table (and any rows still in it) on its own so it can be held back.
+    dependencies = [
+        ('core', '0004_identity'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='user',
+        ),
+    ]
@@ -1,58 +1,33 @@
+from django.contrib.auth.hashers import check_password,make_password
 from django.db import models
 
 # Create your models here.
-class role1(models.Model):
+class RoleType(models.TextChoices):
+    role1 ="role1","role1"
+    QA ="QA","QA"
+    product ="product","product"
+    Admin ="Admin","Admin"
+    accountent ="accountent","accountent"
 
-    username = models.CharField(max_length=30,null=True,blank=True)
-    email = models.EmailField(max_length=100,null=True,blank=True)
-    password = models.CharField(max_length=30,null=True,blank=True)
-    role_type = models.CharField(max_length=10,default="role1")
 
-    def __str__(self):
-        return f"{self.username} -{self.password}"
-    
-class QA(models.Model):
+class identity(models.Model):
 
-    username = models.CharField(max_length=30,null=True,blank=True)
-    email = models.EmailField(max_length=100,null=True,blank=True)
-    password = models.CharField(max_length=30,null=True,blank=True)
-    role_type = models.CharField(max_length=10,default="QA")
+    username = models.CharField(max_length=30,unique=True)
+    email = models.EmailField(max_length=100,unique=True,null=True,blank=True)
+    password = models.CharField(max_length=128)
+    role_type = models.CharField(max_length=10,choices=RoleType.choices)
 
     def __str__(self):
-        return f"{self.username} -{self.password}"
-
-    
-class product(models.Model):
+        return f"{self.username} -{self.role_type}"
 
-    username = models.CharField(max_length=30,null=True,blank=True)
-    email = models.EmailField(max_length=100,null=True,blank=True)
-    password = models.CharField(max_length=30,null=True,blank=True)
-    role_type = models.CharField(max_length=10,default="product")
-
-    def __str__(self):
-        return f"{self.username} -{self.password}"
-    
-    
-class accountent(models.Model):
+    def set_password(self, raw_password):
+        self.password = make_password(raw_password)
 
-    username = models.CharField(max_length=30,null=True,blank=True)
-    email = models.EmailField(max_length=100,null=True,blank=True)
-    password = models.CharField(max_length=30,null=True,blank=True)
-    role_type = models.CharField(max_length=10,default="accountent")
-
-    def __str__(self):
-        return f"{self.username} -{self.password}"
-    
-    
-class Admin(models.Model):
-
-    username = models.CharField(max_length=30,null=True,blank=True)
-    email = models.EmailField(max_length=100,null=True,blank=True)
-    password = models.CharField(max_length=30,null=True,blank=True)
-    role_type = models.CharField(max_length=10,default="Admin")
-
-    def __str__(self):
-        return f"{self.username} -{self.password}"
+    def check_password(self, raw_password):
+        def upgrade(raw_password):
+            self.set_password(raw_password)
+            self.save(update_fields=["password"])
+        return check_password(raw_password, self.password, upgrade)
 
 #product 
 class product_details(models.Model):
@@ -1,37 +1,17 @@
 from rest_framework import serializers
-from . models import role1,product_details,QA,product,accountent,Admin,product_details,product_material,product_options,plan_product,schedule,account_page
+from . models import identity,product_details,product_material,product_options,plan_product,schedule,schedule_process,account_page
 
 
-class role1Serializer(serializers.ModelSerializer):
+class identitySerializer(serializers.ModelSerializer):
     class Meta:
-        model = role1
-        fields = "__all__"
+        model = identity
+        exclude = ["password"]
 
 class product_detailsSerializer(serializers.ModelSerializer):
     class Meta:
         model = product_details
         fields = "__all__"
 
-class QASerializer(serializers.ModelSerializer):
-    class Meta:
-        model = QA
-        fields ="__all__"
-
-class productSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = product
-        fields ="__all__"
-
-class accountentSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = accountent
-        fields ="__all__"
-
-class AdminSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Admin
-        fields ="__all__"
-
 class product_detailsSerializer(serializers.ModelSerializer):
     class Meta:
         model = product_details
@@ -58,6 +38,20 @@ class scheduleSerializer(serializers.ModelSerializer):
         fields ="__all__"
 
 
+class schedule_processSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = schedule_process
+        fields = ["schedule_name","process","process_date","cycle_time","operator_name","remark"]
+
+
+class scheduleNestedSerializer(serializers.ModelSerializer):
+    process_details = schedule_processSerializer(source="processes",many=True,read_only=True)
+
+    class Meta:
+        model = schedule
+        fields = ["id","product_plan","commitment_date","planning_date","date_of_inspection","date_of_delivery","process_details"]
+
+
 class account_pageSerializer(serializers.ModelSerializer):
     class Meta:
         model = account_page
@@ -1,3 +1,137 @@
+import json
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .models import account_page, identity, plan_product, product_details, schedule, schedule_process
 
 # Create your tests here.
+
+
+class IdentityLoginTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.post("/core/single_signup/", {"username": "asha", "email": "asha@example.com", "password": "s3cret", "role_type": "QA"}, format="json")
+
+    def test_signup_stores_a_hashed_password(self):
+        user = identity.objects.get(username="asha")
+        self.assertNotEqual(user.password, "s3cret")
+        self.assertTrue(user.check_password("s3cret"))
+
+    def test_duplicate_email_or_username_rejected(self):
+        response = self.client.post("/core/single_signup/", {"username": "other", "email": "asha@example.com", "password": "x", "role_type": "Admin"}, format="json")
+        self.assertEqual((response.status_code, response.data["msg"]), (400, "Email already exists"))
+        response = self.client.post("/core/single_signup/", {"username": "asha", "email": "new@example.com", "password": "x", "role_type": "Admin"}, format="json")
+        self.assertEqual((response.status_code, response.data["msg"]), (400, "Username already exists"))
+
+    def test_signups_without_email_do_not_collide(self):
+        for username in ("ravi", "meena"):
+            response = self.client.post("/core/single_signup/", {"username": username, "password": "x", "role_type": "QA"}, format="json")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(identity.objects.filter(email__isnull=True).count(), 2)
+
+    def test_login_is_one_lookup(self):
+        with self.assertNumQueries(1):
+            response = self.client.post("/core/single_login/", {"username": "asha", "password": "s3cret", "role_type": "QA"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["role_type"], "QA")
+
+    def test_wrong_password_or_role_rejected(self):
+        response = self.client.post("/core/single_login/", {"username": "asha", "password": "nope", "role_type": "QA"}, format="json")
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post("/core/single_login/", {"username": "asha", "password": "s3cret", "role_type": "Admin"}, format="json")
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post("/core/single_login/", {"username": "ghost", "password": "s3cret"}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_role_count(self):
+        self.assertEqual(self.client.get("/core/get_role_count/").data["count_QA"], 1)
+
+
+class ScheduleViewTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        detail = product_details.objects.create(Company_name="Acme")
+        self.plan = plan_product.objects.create(product_detail=detail, program_no="P1")
+
+    def add_schedules(self, count, processes=3):
+        for _ in range(count):
+            sched = schedule.objects.create(
+                product_plan=self.plan,
+                commitment_date="2025-01-01",
+                planning_date="2025-01-02",
+                date_of_inspection="2025-01-03",
+                date_of_delivery="2025-01-04",
+            )
+            for step in range(processes):
+                schedule_process.objects.create(schedule_name=sched, process=f"step {step}", process_date="2025-01-02")
+
+    def test_query_count_does_not_grow_with_schedules(self):
+        self.add_schedules(2)
+        with self.assertNumQueries(2):
+            self.client.get("/core/Schedule_view/")
+
+        self.add_schedules(30)
+        with self.assertNumQueries(2):
+            data = self.client.get("/core/Schedule_view/").data
+        self.assertEqual(len(data["results"]), 32)
+        self.assertEqual([p["process"] for p in data["results"][0]["process_details"]], ["step 0", "step 1", "step 2"])
+
+    def test_cursor_pagination(self):
+        self.add_schedules(5, processes=1)
+        first = self.client.get("/core/Schedule_view/", {"limit": 3}).data
+        self.assertEqual(len(first["results"]), 3)
+        second = self.client.get("/core/Schedule_view/", {"limit": 3, "cursor": first["next_cursor"]}).data
+        self.assertEqual(len(second["results"]), 2)
+        self.assertIsNone(second["next_cursor"])
+
+    def test_empty(self):
+        self.assertEqual(self.client.get("/core/Schedule_view/").status_code, 404)
+
+    def test_limit_below_one_rejected(self):
+        self.add_schedules(1, processes=1)
+        for limit in (0, -3):
+            self.assertEqual(self.client.get("/core/Schedule_view/", {"limit": limit}).status_code, 400)
+
+
+class OverAllDetailsTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        for index in range(3):
+            detail = product_details.objects.create(Company_name=f"Company {index}")
+            plan_product.objects.create(product_detail=detail, program_no=f"P{index}")
+        account_page.objects.create(inv_on="INV-1", Amount="12.50", status="open")
+
+    def get_json(self, params):
+        response = self.client.get("/core/over_all_details/", params)
+        self.assertTrue(response.streaming)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_single_section_with_cursor(self):
+        first = self.get_json({"sections": "product_details", "limit": 2})
+        self.assertEqual(list(first), ["product_details"])
+        self.assertEqual([row["Company_name"] for row in first["product_details"]["results"]], ["Company 0", "Company 1"])
+
+        cursor = first["product_details"]["next_cursor"]
+        second = self.get_json({"sections": "product_details", "limit": 2, "product_details_cursor": cursor})
+        self.assertEqual([row["Company_name"] for row in second["product_details"]["results"]], ["Company 2"])
+        self.assertIsNone(second["product_details"]["next_cursor"])
+
+    def test_all_sections_one_query_each(self):
+        with self.assertNumQueries(7):
+            data = self.get_json({})
+        self.assertEqual(len(data), 7)
+        self.assertEqual(data["account_pages"]["results"][0]["Amount"], "12.50")
+        self.assertEqual(data["plan_products"]["results"][0]["product_detail"], data["product_details"]["results"][0]["id"])
+
+    def test_unknown_section(self):
+        self.assertEqual(self.client.get("/core/over_all_details/", {"sections": "nope"}).status_code, 400)
+
+    def test_limit_below_one_rejected_before_streaming(self):
+        for limit in (0, -3):
+            response = self.client.get("/core/over_all_details/", {"limit": limit})
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.streaming)
@@ -1,9 +1,14 @@
 from django.shortcuts import render
 from rest_framework.response import Response
-from .models import role1,QA,Admin,accountent,product,product_details,plan_product,product_material,product_details
+from django.contrib.auth.hashers import make_password
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.db import IntegrityError
+from django.db.models import Count,Prefetch,Q
+from .models import identity,RoleType,product_details,plan_product,product_material,product_details
 from .models import product_options,schedule,account_page,schedule_process
 from rest_framework import status
-from .serializers  import role1Serializer,product_detailsSerializer
+from .serializers  import product_detailsSerializer,scheduleNestedSerializer
 from rest_framework.decorators import api_view
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import permission_classes
@@ -16,91 +21,60 @@ def single_login(request):
     password = request.data.get("password")
     role_type = request.data.get("role_type")
 
-    if not username or not password or not role_type:
+    if not username or not password:
         return Response("user not found")
-    try:
-        if role_type == "role1":
-            role1_login = role1.objects.get(username=username,password=password,role_type=role_type)
-        elif role_type == "QA":
-            Qa_login = QA.objects.get(username=username,password=password,role_type=role_type)
-        elif role_type == "product":
-            product_login = product.objects.get(username=username,password=password,role_type=role_type)
-        elif role_type == "Admin":
-            Admin_login = Admin.objects.get(username=username,password=password,role_type=role_type)
-        elif role_type == "accountent":
-            accountent_login = accountent.objects.get(username=username,password=password,role_type=role_type)
-        else:
-            return Response({"msg":"invalid user"})
-        
-    except (role1.DoesNotExist, QA.DoesNotExist, product.DoesNotExist,
-            Admin.DoesNotExist, accountent.DoesNotExist):
+
+    user = identity.objects.filter(username=username).first()
+    if user is None:
+        # hash anyway so unknown usernames take as long as wrong passwords
+        make_password(password)
+        return Response({"msg": "Invalid username or password."}, status=status.HTTP_401_UNAUTHORIZED)
+
+    if (role_type and user.role_type != role_type) or not user.check_password(password):
         return Response({"msg": "Invalid username or password."}, status=status.HTTP_401_UNAUTHORIZED)
 
     # Login successful
     return Response({
         "msg": "Login successful",
-        "username": username,
-        "role_type": role_type
+        "username": user.username,
+        "role_type": user.role_type
     }, status=status.HTTP_200_OK)
 
 
 permission_classes([IsAuthenticated])
 @api_view(['GET'])
 def get_user_data(request):
-    get_data =role1.objects.all()
-
-    get=[]
-    for gets in get_data:
-        get.append({
-            "username":gets.username,
-            "password":gets.password,
-        })
-    return Response(get)
+    get_data =identity.objects.filter(role_type=RoleType.role1).values("username","role_type")
+    return Response(list(get_data))
 
 @api_view(['POST'])
 def admin_single_signup(request):
     username =request.data.get("username")
-    email = request.data.get("email")
+    email = request.data.get("email") or None
     password = request.data.get("password")
     role_type =request.data.get("role_type")
 
+    if role_type not in RoleType.values or not username or not password:
+        return Response({"msg":"invaild data"},status=200)
 
+    # email is optional; an empty one must not collide with every other email-less user
+    taken = Q(username=username) | Q(email=email) if email else Q(username=username)
+    clash = identity.objects.filter(taken).values_list("username", flat=True).first()
+    if clash is not None:
+        field = "Username" if clash == username else "Email"
+        return Response({"msg": f"{field} already exists"}, status=400)
 
-    email_exists = (
-        role1.objects.filter(email=email).exists() or
-        QA.objects.filter(email=email).exists() or
-        product.objects.filter(email=email).exists() or
-        Admin.objects.filter(email=email).exists() or
-        accountent.objects.filter(email=email).exists()
-    )
-
-    if email_exists:
-        return Response({"msg": "Email already exists"}, status=400)
- 
+    user = identity(username=username,email=email,role_type=role_type)
+    user.set_password(password)
     try:
-        if role_type =="role1":
-            role = role1.objects.create(username=username,email=email,password=password,role_type=role_type)
-        elif role_type == "QA":
-            role2 = QA.objects.create(username=username,email=email,password=password,role_type=role_type)
-        elif role_type == "product":
-            role3 = product.objects.create(username=username,email=email,password=password,role_type=role_type)
-        elif role_type == "Admin":
-            role2 = Admin.objects.create(username=username,email=email,password=password,role_type=role_type)
-        elif role_type == "accountent":
-            role2 = accountent.objects.create(username=username,email=email,password=password,role_type=role_type)
-        else:
-            return Response({"msg":"invaild data"},status=200)
-        
-    except (role1.DoesNotExist, QA.DoesNotExist, product.DoesNotExist,
-            Admin.DoesNotExist, accountent.DoesNotExist):
-        return Response({"msg": "Invalid username or password."}, status=status.HTTP_401_UNAUTHORIZED)
+        user.save()
+    except IntegrityError:
+        return Response({"msg": "Username or email already exists"}, status=400)
 
-    # Login successful
     return Response({
         "msg": "signup successful",
         "username": username,
         "email":email,
-        "password":password,
         "role_type": role_type
     }, status=200 )   
 
@@ -111,18 +85,8 @@ def logout(request):
 
     if not username or not role_type:
         return Response ({"msg":"username and roletype is not found"},status=200)
-    
-    if role_type == "role1":
-        role_1 = role1.objects.get(username=username)
-    elif role_type == "QA":
-        qa = QA.objects.get(username=username)
-    elif role_type == "product":
-        product_logout = product.objects.get(username=username)
-    elif role_type == "Admin":
-        admin = Admin.objects.get(username=username)
-    elif role_type == "accountent":
-        account = accountent.objects.get(username=username)
-    else:
+
+    if not identity.objects.filter(username=username,role_type=role_type).exists():
         return Response({"logout not successfully "},status=400)
     return Response({
     "msg":"logout successfully",
@@ -418,83 +382,38 @@ def Schedule_process(request):
                      "remark":remark,
                   
                    },status=200)
-@api_view(['GET'])
-def Schedule_view(request):
-    schedules = schedule.objects.all()
-
-    if not schedules.exists():
-        return Response({"msg": "No schedule data found"}, status=400)
-
-    schedule_list = []
-
-    for sched in schedules:
-        # Fetch all related schedule_process for this schedule
-        processes = schedule_process.objects.filter(schedule_name=sched)
-
-        process_list = []
-        for proc in processes:
-            process_list.append({
-                "plan_product": proc.product_plan.id if proc.product_plan else None,
-                "process": proc.process,
-                "process_date": proc.process_date,
-                "cycle_time": proc.cycle_time,
-                "operator_name": proc.operator_name,
-                "remark": proc.remark
-            })
-
-        schedule_list.append({
-            "commitment_date": sched.commitment_date,
-            "planning_date": sched.planning_date,
-            "date_of_delivery": sched.date_of_delivery,
-            "date_of_inspection": sched.date_of_inspection,
-            "processes": process_list  # nested processes
-        })
-
-    return Response({
-        "msg": "Schedule data retrieved successfully",
-        "schedules": schedule_list
-    }, status=200)
+SCHEDULE_PAGE_SIZE = 50
+SCHEDULE_MAX_PAGE_SIZE = 500
 
 
 @api_view(['GET'])
 def Schedule_view(request):
     try:
-        schedules = schedule.objects.all()
-
-        if not schedules.exists():
-            return Response({"msg": "No schedule data found"}, status=404)
-
-        response_data = []
-        for sch in schedules:
-            # Fetch all related process records for this schedule
-            processes = schedule_process.objects.filter(schedule_name=sch)
-
-            # Build nested process data
-            process_data = [
-                {
-                    "schedule_name":p.schedule_name.id,
-                    "process_date": p.process_date,
-                    "cycle_time": p.cycle_time,
-                    "operator_name": p.operator_name,
-                    "remark": p.remark,
-                }
-                for p in processes
-            ]
-
-            # Add schedule + its processes
-            response_data.append({
-                "product_plan":sch.product_plan.id,
-                "commitment_date": sch.commitment_date,
-                "planning_date": sch.planning_date,
-                "date_of_inspection": sch.date_of_inspection,
-                "date_of_delivery": sch.date_of_delivery,
-                "process_details": process_data,
-            })
-
-        return Response(response_data, status=200)
-
-    except Exception as e:
-        return Response({"error": str(e)}, status=500)
+        limit = min(int(request.query_params.get("limit", SCHEDULE_PAGE_SIZE)), SCHEDULE_MAX_PAGE_SIZE)
+        cursor = int(request.query_params.get("cursor", 0))
+    except ValueError:
+        return Response({"msg": "limit and cursor must be numbers"}, status=400)
+    if limit < 1:
+        return Response({"msg": "limit must be at least 1"}, status=400)
+
+    # two queries per page: the schedules, then all of their processes
+    schedules = list(
+        schedule.objects.filter(id__gt=cursor)
+        .order_by("id")
+        .prefetch_related(Prefetch("schedule_process_set", queryset=schedule_process.objects.order_by("id"), to_attr="processes"))
+        [:limit + 1]
+    )
+
+    if not schedules and not cursor:
+        return Response({"msg": "No schedule data found"}, status=404)
+
+    has_more = len(schedules) > limit
+    schedules = schedules[:limit]
+
+    return Response({
+        "results": scheduleNestedSerializer(schedules, many=True).data,
+        "next_cursor": schedules[-1].id if has_more else None,
+    }, status=200)
 
 @api_view(["GET"])
 def product_qa_view(request):
@@ -641,14 +560,11 @@ def account_view(request):
 #admin page
 @api_view(['GET'])
 def get_role_count(request):
-    count_role =role1.objects.count()
-    count_qa =QA.objects.count()
-    count_product =product.objects.count()
-    count_accountent=accountent.objects.count()
-    return Response({"count":count_role,
-                     "count_QA":count_qa,
-                     "count_product":count_product,
-                     "count_accountent":count_accountent
+    counts = dict(identity.objects.values_list("role_type").annotate(total=Count("id")))
+    return Response({"count":counts.get(RoleType.role1,0),
+                     "count_QA":counts.get(RoleType.QA,0),
+                     "count_product":counts.get(RoleType.product,0),
+                     "count_accountent":counts.get(RoleType.accountent,0)
                      },status=200)
 
 @api_view(['GET'])
@@ -658,131 +574,55 @@ def total_product(request):
            
 
 
+OVERALL_SECTIONS = {
+    "product_details": (product_details, ["id","Company_name","serial_number","date","Customer_name","Customer_No","Customer_date","mobile","status"]),
+    "product_materials": (product_material, ["id","product_detail","material_Description","Quantity","Remarks"]),
+    "product_options": (product_options, ["id","product_material","size","Thick","Grade","Drawing","Test_Certificate"]),
+    "plan_products": (plan_product, ["id","product_detail","program_no","lm_co1","lm_co2","lm_co3","fm_co1","fm_co2","fm_co3","status"]),
+    "schedules": (schedule, ["id","product_plan","commitment_date","planning_date","date_of_inspection","date_of_delivery"]),
+    "schedule_processes": (schedule_process, ["id","schedule_name","process","process_date","cycle_time","operator_name","remark"]),
+    "account_pages": (account_page, ["id","inv_on","Date","Amount","mode_of_pay","mat_inspected","mat_received","process_plan","process_approve","remark","status"]),
+}
+OVERALL_PAGE_SIZE = 100
+OVERALL_MAX_PAGE_SIZE = 1000
+
+
+def stream_sections(sections, cursors, limit):
+    """Yield the report as JSON text one row at a time"""
+    encoder = DjangoJSONEncoder()
+    yield "{"
+    for index, name in enumerate(sections):
+        model, fields = OVERALL_SECTIONS[name]
+        rows = model.objects.filter(id__gt=cursors[name]).order_by("id").values(*fields)[:limit + 1]
+
+        yield f'{"," if index else ""}{encoder.encode(name)}:{{"results":['
+        last_id = None
+        count = 0
+        for row in rows.iterator(chunk_size=limit + 1):
+            count += 1
+            if count > limit:
+                break
+            yield ("," if count > 1 else "") + encoder.encode(row)
+            last_id = row["id"]
+        next_cursor = last_id if count > limit else None
+        yield f'],"next_cursor":{encoder.encode(next_cursor)}}}'
+    yield "}"
+
+
 @api_view(['GET'])
 def over_all_details(request):
-    product_details_qs = product_details.objects.all()
-    product_options_qs = product_options.objects.all()
-    plan_product_qs = plan_product.objects.all()
-    schedule_qs = schedule.objects.all()
-    schedule_process_qs = schedule_process.objects.all()
-    account_page_qs = account_page.objects.all()
-    product_material_qs = product_material.objects.all()
-
-    product_details_list = [
-        {
-            "Company_name": pro.Company_name,
-            "serial_number": pro.serial_number,
-            "date": pro.date,
-            "Customer_name": pro.Customer_name,
-            "Customer_No": pro.Customer_No,
-            "Customer_date": pro.Customer_date,
-            "mobile": pro.mobile,
-            "created_by":pro.created_by.username
-        }
-        for pro in product_details_qs
-    ]
-
-
-    product_material_list = [
-        {
-            "material_Description": mat.material_Description,
-            "Quantity": mat.Quantity,
-            "Remarks": mat.Remarks
-        }
-        for mat in product_material_qs
-    ]
-    
-    product_options_list =[
-        {
-        "product_material":opt.product_material.id,
-        "size":opt.size,
-        "Thick":opt.Thick,
-        "Grade":opt.Grade,
-        "Drawing":opt.Drawing,
-        "Test_Certificate":opt.Test_Certificate
-        }
-        for opt in product_options_qs
-    ]
-
-    plan_product_list =[
-        {
-        "product_detail":plan.product_detail.id,
-        "program_no":plan.program_no,
-        "lm_co1":plan.lm_co1,
-        "lm_co2":plan.lm_co2,
-        "lm_co3":plan.lm_co3,
-        "fm_co1":plan.fm_co1,
-        "fm_co2":plan.fm_co2,
-        "fm_co3":plan.fm_co3,
-        "status":plan.status,
-        "created_by":plan.created_by.username
-
-        }
-        for plan in plan_product_qs
-        ]
-    schedule_list=[
-
-        {
-            "product_plan":sch.product_plan.id,
-            "commitment_date":sch.commitment_date,
-            "planning_date":sch.planning_date,
-            "date_of_inspection":sch.date_of_inspection,
-            "date_of_delivery":sch.date_of_delivery,
-            "created_by":sch.created_by.username
-
-
-        }
-        for sch in schedule_qs
-    ]
-
-    schedule_process_list =[
-        {
-            "schedule_name":spro.schedule_name.id,
-            "process_date":spro.process_date,
-            "cycle_time":spro.cycle_time,
-            "operator_name":spro.operator_name,
-            "remark":spro.remark
-        }
-        for spro in schedule_process_qs
-
-    ]
-
-    account_page_list =[
-        {
-            "inv_on":acc.inv_on,
-            "Date":acc.Date,
-            "Amount":acc.Amount,
-            "mode_of_pay":acc.mode_of_pay,
-            "mat_inspected":acc.mat_inspected,
-            "mat_received":acc.mat_received,
-            "process_plan":acc.process_plan,
-            "process_approve":acc.process_approve,
-            "remark":acc.remark,
-            "created_by":acc.created_by.username
-
-
-
-        }
-        for acc in account_page_qs
-
-    ]
-
-    response_data = {
-        "product_details": product_details_list,
-        "product_materials": product_material_list,
-        "product_options": product_options_list,
-        "plan_products": plan_product_list,
-        "schedules": schedule_list,
-        "schedule_processes": schedule_process_list,
-        "account_pages": account_page_list
-    }
-
-    return Response(response_data)
-
-
-      
-  
-
-      
-      
-      
+    requested = request.query_params.get("sections")
+    sections = requested.split(",") if requested else list(OVERALL_SECTIONS)
+    unknown = [name for name in sections if name not in OVERALL_SECTIONS]
+    if unknown:
+        return Response({"msg": "unknown section", "sections": unknown}, status=400)
+
+    try:
+        limit = min(int(request.query_params.get("limit", OVERALL_PAGE_SIZE)), OVERALL_MAX_PAGE_SIZE)
+        cursors = {name: int(request.query_params.get(f"{name}_cursor", 0)) for name in sections}
+    except ValueError:
+        return Response({"msg": "limit and cursors must be numbers"}, status=400)
+    if limit < 1:
+        return Response({"msg": "limit must be at least 1"}, status=400)
+
+    return StreamingHttpResponse(stream_sections(sections, cursors, limit), content_type="application/json")